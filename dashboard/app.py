@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, Response, request, redirect, url_for, flash
+from flask import Flask, render_template, jsonify, Response, request, redirect, url_for, flash, stream_with_context
 import sqlite3
 from datetime import datetime, timedelta
 import random
@@ -7,20 +7,41 @@ import threading
 import csv
 import io
 import json
+import math
 import os
+import atexit
+
+import numpy as np
 
 # Import Firebase backup service
 from firebase_backup import FirebaseBackupService
+from ingest_queue import IngestQueue, IngestQueueFull, ACK_AFTER_ENQUEUE
+from database import get_connection, to_epoch, from_epoch
+from init_db import migrate
+from rollups import apply_readings
+from downsample import lttb
+from events import EventBroker
+from hot_state import HotState, DEFAULT_STATION
+from online_forecaster import OnlineForecaster
+from forecast_scheduler import ForecastScheduler, save_forecasts, load_forecasts, forecast_date
+from shadow_inference import ShadowRunner
 
 app = Flask(__name__)
 app.secret_key = 'weather_dashboard_secret_key_2025'  # For flash messages
 
+# SQLite database shared by the dashboard, predictor and backup service
+DB_PATH = os.environ.get('DATABASE_PATH', 'weather.db')
+
 # Initialize Firebase backup service
 firebase_config_path = os.path.join(os.path.dirname(__file__), 'firebase_config.json')
 firebase_backup = FirebaseBackupService(
     config_path=firebase_config_path if os.path.exists(firebase_config_path) else None,
-    db_path='weather.db'
+    db_path=DB_PATH,
+    replication_interval=float(os.environ.get('FIREBASE_REPLICATION_SECONDS', 5)),
+    status_ttl=float(os.environ.get('FIREBASE_STATUS_TTL', 60))
 )
+# Registered before the ingest queue, so it stops after the last readings are queued
+atexit.register(firebase_backup.stop_replication_worker)
 
 
 # Default alert thresholds
@@ -33,42 +54,354 @@ DEFAULT_THRESHOLDS = {
     'extreme_heat': 40.0       # Temperature >= 40
 }
 
-# Real sensor data handling
-def store_sensor_data(temperature, humidity, timestamp=None, pressure=None):
-    """Store real sensor data in the database and backup to Firebase"""
-    global current_temperature, current_humidity
+# Valid sensor ranges shared by the single and batch ingest endpoints
+SENSOR_RANGES = {
+    'temperature': (-50, 60),   # °C
+    'humidity': (0, 100),       # %
+    'pressure': (800, 1200)     # hPa
+}
+
+# Upper bound on readings accepted by one batch request
+MAX_BATCH_SIZE = 5000
+MAX_STATION_ID_LENGTH = 64
+
+# Latest readings, alerts and forecast served from memory
+hot_state = HotState()
+
+# Station whose daily data the forecasts are made from
+FORECAST_STATION = os.environ.get('FORECAST_STATION', DEFAULT_STATION)
+
+# Constant-time statistical forecast, updated by every ingested batch
+online_forecaster = OnlineForecaster(save_interval=int(os.environ.get('FORECASTER_SAVE_SECONDS', 300)),
+                                     station_id=FORECAST_STATION)
+
+def save_online_forecaster():
+    """Persist the online forecaster state (also runs at exit, after the ingest queue is flushed)"""
+    conn = get_db()
+    try:
+        online_forecaster.save(conn)
+    except Exception as e:
+        print(f"⚠️ Could not save forecaster state: {e}")
+    finally:
+        conn.close()
+
+atexit.register(save_online_forecaster)
+
+# Live updates pushed to connected dashboards (/api/stream)
+event_broker = EventBroker()
+_last_published_day = None
+
+def publish_ingest_events(records, touched_days):
+    """Update the hot state and push new readings, changed alerts and forecast updates"""
+    global _last_published_day
     
-    # Update global variables for forecast generation
-    current_temperature = float(temperature)
-    current_humidity = float(humidity)
+    latest = hot_state.record_readings(records)
     
-    # Use provided timestamp or current time
-    if timestamp is None:
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    # Only the appended points; backfilled readings older than the chart window are skipped
+    window_start = from_epoch(int(time.time()) - 24 * 3600)
+    points = sorted(
+        ({'timestamp': r['timestamp'], 'temperature': r['temperature'], 'humidity': r['humidity']}
+         for r in records if r['timestamp'] >= window_start),
+        key=lambda point: point['timestamp']
+    )
+    event_broker.publish('readings', {
+        'current': {
+            'temperature': latest['temperature'],
+            'humidity': latest['humidity'],
+            'timestamp': latest['timestamp']
+        },
+        'points': points
+    })
+    
+    # Push alerts only when the set of active alerts changes
+    alerts = check_alerts(latest['temperature'], latest['humidity'])
+    if hot_state.set_alerts(alerts):
+        event_broker.publish('alerts', {'alerts': alerts})
+    
+    # The forecast only depends on daily data, so refresh it when a new day starts
+    newest_day = max(touched_days) if touched_days else None
+    if newest_day is not None and (_last_published_day is None or newest_day > _last_published_day):
+        _last_published_day = newest_day
+        if dashboard_predictor:
+            dashboard_predictor.notify_daily_data(newest_day)
+        # Computed on the scheduler thread so the ingest writer never runs the model
+        forecast_scheduler.trigger()
+
+# Days shown on the forecast card (tomorrow plus the following days)
+FORECAST_HORIZON_DAYS = int(os.environ.get('FORECAST_HORIZON_DAYS', 7))
+
+def refresh_forecast():
+    """Compute the forecast, store it and push it to connected dashboards"""
+    forecast = generate_forecast()
+    forecast['date'] = forecast_date(1)
+    forecast['generated_at'] = int(time.time())
+    if dashboard_predictor:
+        cache_stats = dashboard_predictor.get_cache_stats()
+        forecast['model_id'] = cache_stats['model_id']
+        forecast['data_version'] = cache_stats['data_version']
+    
+    # Tomorrow's full forecast plus one row per later day of the horizon
+    rows = [forecast] + [
+        dict(day,
+             model_used=forecast['model_used'],
+             model_id=forecast.get('model_id'),
+             data_version=forecast.get('data_version'),
+             generated_at=forecast['generated_at'])
+        for day in forecast['daily'][1:]
+    ]
     
     conn = get_db()
-    cursor = conn.execute('''
-        INSERT INTO sensor_data (timestamp, temperature, humidity, pressure)
-        VALUES (?, ?, ?, ?)
-    ''', (timestamp, temperature, humidity, pressure))
-    
-    # Get the ID of the inserted record
-    record_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    try:
+        save_forecasts(conn, rows)
+    finally:
+        conn.close()
     
-    print(f"Stored real sensor data: {timestamp} - Temp: {temperature}°C, Humidity: {humidity}%")
+    hot_state.set_forecast(forecast)
+    event_broker.publish('forecast', forecast_summary(forecast))
+    return forecast
+
+# Precomputes the forecast in the background (hourly by default, and when a new day closes)
+forecast_scheduler = ForecastScheduler(
+    refresh_forecast,
+    interval_seconds=int(os.environ.get('FORECAST_INTERVAL_SECONDS', 3600))
+)
+atexit.register(forecast_scheduler.stop)
+
+def forecast_summary(forecast):
+    """Forecast fields shown on the dashboard card"""
+    return {
+        'temperature': forecast['temperature'],
+        'humidity': forecast['humidity'],
+        'min_temperature': forecast['min_temperature'],
+        'max_temperature': forecast['max_temperature'],
+        'description': forecast['condition'],
+        'daily': forecast.get('daily', [])
+    }
+
+def forecast_day(prediction):
+    """One day of the multi-day forecast"""
+    return {
+        'date': prediction['prediction_date'],
+        'temperature': round(prediction['avg_temperature'], 1),
+        'min_temperature': round(prediction['min_temperature'], 1),
+        'max_temperature': round(prediction['max_temperature'], 1),
+        'condition': get_weather_condition(prediction['avg_temperature']),
+        'condition_icon': get_weather_icon(prediction['avg_temperature']),
+        'confidence': prediction.get('confidence')
+    }
+
+# Real sensor data handling
+def write_sensor_batch(rows):
+    """Write one group of readings to the database in a single transaction.
+
+    Called by the ingest writer thread. rows is a list of
+    (timestamp, temperature, humidity, pressure, station_id) tuples; returns
+    the stored records (with their new ids).
+    """
+    if not rows:
+        return []
     
-    # Backup to Firebase if enabled
-    if firebase_backup.backup_enabled:
-        record = {
-            'id': record_id,
+    readings = [(to_epoch(timestamp), temperature, humidity, pressure, station_id)
+                for timestamp, temperature, humidity, pressure, station_id in rows]
+    
+    conn = get_db()
+    try:
+        with conn:
+            conn.executemany('''
+                INSERT INTO sensor_data (timestamp, ts, temperature, humidity, pressure, station_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(row[0],) + reading for row, reading in zip(rows, readings)])
+            # Rows inserted by one statement in one transaction get consecutive ids
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            first_id = last_id - len(rows) + 1
+            # Keep hourly/daily rollups in step within the same transaction
+            touched_days = {day for station, day in apply_readings(conn, readings) if station == FORECAST_STATION}
+            # Queue the readings for Firebase replication atomically with the insert
+            firebase_backup.enqueue_records(conn, range(first_id, last_id + 1))
+        
+        online_forecaster.update(sorted(readings, key=lambda reading: reading[0] or 0))
+        online_forecaster.save_if_due(conn)
+    finally:
+        conn.close()
+    
+    firebase_backup.notify_replication()
+    
+    records = [
+        {
+            'id': first_id + offset,
             'timestamp': timestamp,
             'temperature': float(temperature),
             'humidity': float(humidity),
-            'pressure': float(pressure) if pressure else None
+            'pressure': float(pressure) if pressure is not None else None,
+            'station_id': station_id
         }
-        firebase_backup.backup_single_record(record)
+        for offset, (timestamp, temperature, humidity, pressure, station_id) in enumerate(rows)
+    ]
+    
+    latest = records[-1]
+    print(f"Stored {len(records)} sensor reading(s), latest: {latest['timestamp']} - "
+          f"Temp: {latest['temperature']}°C, Humidity: {latest['humidity']}%")
+    
+    try:
+        publish_ingest_events(records, touched_days)
+    except Exception as e:
+        print(f"Error publishing live updates: {e}")
+    
+    return records
+
+# Write-behind queue: request handlers only enqueue, the writer thread group-commits
+ingest_queue = IngestQueue(
+    write_sensor_batch,
+    max_queue_size=int(os.environ.get('INGEST_MAX_QUEUE', 10000)),
+    flush_rows=int(os.environ.get('INGEST_FLUSH_ROWS', 200)),
+    flush_interval_ms=int(os.environ.get('INGEST_FLUSH_MS', 250)),
+    durability=os.environ.get('INGEST_DURABILITY', ACK_AFTER_ENQUEUE),
+    max_retries=int(os.environ.get('INGEST_MAX_RETRIES', 3)),
+    dead_letter_path=os.environ.get('INGEST_DEAD_LETTER', 'ingest_dead_letter.jsonl')
+)
+atexit.register(ingest_queue.stop)
+
+def store_sensor_batch(rows):
+    """Queue a batch of validated readings for storage.
+
+    rows: list of (timestamp, temperature, humidity, pressure, station_id) tuples
+    Returns the stored records in "ack after commit" mode, or None in
+    "ack after enqueue" mode. Raises IngestQueueFull when the queue is full.
+    """
+    return ingest_queue.submit(rows)
+
+def store_sensor_data(temperature, humidity, timestamp=None, pressure=None, station_id=DEFAULT_STATION):
+    """Store real sensor data in the database and backup to Firebase"""
+    # Use provided timestamp or current time
+    if timestamp is None:
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    records = store_sensor_batch([(
+        timestamp,
+        float(temperature),
+        float(humidity),
+        float(pressure) if pressure is not None else None,
+        station_id
+    )])
+    return records[0] if records else None
+
+def _to_float(value):
+    """Convert a JSON value to float, using NaN for missing or invalid values"""
+    if value is None or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _station_id(item):
+    """Station id of a reading ('station_id', or the older 'sensor_id'); None if invalid"""
+    station = item.get('station_id', item.get('sensor_id'))
+    if station is None or station == '':
+        return DEFAULT_STATION
+    if not isinstance(station, str) or len(station) > MAX_STATION_ID_LENGTH:
+        return None
+    return station
+
+def validate_sensor_batch(readings):
+    """Validate a list of reading dicts in one vectorized pass.
+
+    Returns (rows, results): rows are (timestamp, temperature, humidity, pressure,
+    station_id) tuples for the accepted readings, results holds one status entry per input item.
+    """
+    count = len(readings)
+    is_dict = np.array([isinstance(item, dict) for item in readings], dtype=bool)
+    items = [item if isinstance(item, dict) else {} for item in readings]
+    
+    temperature = np.array([_to_float(item.get('temperature')) for item in items], dtype=np.float64)
+    humidity = np.array([_to_float(item.get('humidity')) for item in items], dtype=np.float64)
+    pressure = np.array([_to_float(item.get('pressure')) for item in items], dtype=np.float64)
+    has_pressure = np.array([item.get('pressure') is not None for item in items], dtype=bool)
+    
+    # Sensor timestamps are optional, but must parse when given
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    epochs = [to_epoch(item['timestamp']) if item.get('timestamp') else to_epoch(now) for item in items]
+    bad_timestamp = np.array([ts is None for ts in epochs], dtype=bool)
+    
+    stations = [_station_id(item) for item in items]
+    bad_station = np.array([station is None for station in stations], dtype=bool)
+    
+    temp_min, temp_max = SENSOR_RANGES['temperature']
+    humidity_min, humidity_max = SENSOR_RANGES['humidity']
+    pressure_min, pressure_max = SENSOR_RANGES['pressure']
+    
+    # Each check is evaluated for the whole batch at once; NaN fails every range test
+    checks = [
+        (~is_dict, 'Reading must be a JSON object'),
+        (np.isnan(temperature) | np.isnan(humidity), 'Temperature and humidity are required'),
+        (~((temperature >= temp_min) & (temperature <= temp_max)), 'Temperature out of valid range (-50 to 60°C)'),
+        (~((humidity >= humidity_min) & (humidity <= humidity_max)), 'Humidity out of valid range (0 to 100%)'),
+        (has_pressure & ~((pressure >= pressure_min) & (pressure <= pressure_max)), 'Pressure out of valid range (800 to 1200 hPa)'),
+        (bad_timestamp, 'Invalid timestamp format (expected YYYY-MM-DD HH:MM:SS)'),
+        (bad_station, f'station_id must be a string of at most {MAX_STATION_ID_LENGTH} characters')
+    ]
+    
+    errors = [None] * count
+    rejected = np.zeros(count, dtype=bool)
+    for failed, message in checks:
+        # Report only the first failing check per item
+        for index in np.flatnonzero(failed & ~rejected):
+            errors[index] = message
+        rejected |= failed
+    
+    rows = []
+    results = []
+    for index in range(count):
+        if rejected[index]:
+            results.append({'index': index, 'status': 'rejected', 'error': errors[index]})
+            continue
+        timestamp = from_epoch(epochs[index])  # Normalized display format
+        rows.append((
+            timestamp,
+            float(temperature[index]),
+            float(humidity[index]),
+            float(pressure[index]) if has_pressure[index] else None,
+            stations[index]
+        ))
+        results.append({'index': index, 'status': 'accepted', 'timestamp': timestamp})
+    
+    return rows, results
+
+@app.route('/api/sensor_data/batch', methods=['POST'])
+def receive_sensor_batch():
+    """API endpoint to receive many sensor readings in one request"""
+    try:
+        data = request.get_json(silent=True)
+        
+        # Accept either a bare array or {"readings": [...]}
+        readings = data.get('readings') if isinstance(data, dict) else data
+        
+        if not isinstance(readings, list) or not readings:
+            return jsonify({'error': 'Expected a non-empty list of readings'}), 400
+        
+        if len(readings) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large (maximum {MAX_BATCH_SIZE} readings)'}), 413
+        
+        rows, results = validate_sensor_batch(readings)
+        records = store_sensor_batch(rows)
+        
+        # Stored ids are only known once committed ("ack after commit" mode)
+        accepted = [result for result in results if result['status'] == 'accepted']
+        for result, record in zip(accepted, records or []):
+            result['id'] = record['id']
+        
+        return jsonify({
+            'status': 'success' if len(accepted) == len(results) else ('partial' if accepted else 'rejected'),
+            'accepted': len(accepted),
+            'rejected': len(results) - len(accepted),
+            'results': results
+        }), 200
+        
+    except IngestQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        print(f"Error receiving sensor batch: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/sensor_data', methods=['POST'])
 def receive_sensor_data():
@@ -89,30 +422,62 @@ def receive_sensor_data():
         if temperature is None or humidity is None:
             return jsonify({'error': 'Temperature and humidity are required'}), 400
         
+        if timestamp is not None:
+            ts = to_epoch(timestamp)
+            if ts is None:
+                return jsonify({'error': 'Invalid timestamp format (expected YYYY-MM-DD HH:MM:SS)'}), 400
+            timestamp = from_epoch(ts)
+        
+        station_id = _station_id(data)
+        if station_id is None:
+            return jsonify({'error': f'station_id must be a string of at most {MAX_STATION_ID_LENGTH} characters'}), 400
+        
         # Validate data ranges
-        if not (-50 <= float(temperature) <= 60):  # Reasonable temperature range
+        temp_min, temp_max = SENSOR_RANGES['temperature']
+        if not (temp_min <= float(temperature) <= temp_max):  # Reasonable temperature range
             return jsonify({'error': 'Temperature out of valid range (-50 to 60°C)'}), 400
             
-        if not (0 <= float(humidity) <= 100):  # Humidity percentage
+        humidity_min, humidity_max = SENSOR_RANGES['humidity']
+        if not (humidity_min <= float(humidity) <= humidity_max):  # Humidity percentage
             return jsonify({'error': 'Humidity out of valid range (0 to 100%)'}), 400
         
         # Validate pressure if provided
-        if pressure is not None and not (800 <= float(pressure) <= 1200):  # Reasonable pressure range in hPa
+        pressure_min, pressure_max = SENSOR_RANGES['pressure']
+        if pressure is not None and not (pressure_min <= float(pressure) <= pressure_max):  # Reasonable pressure range in hPa
             return jsonify({'error': 'Pressure out of valid range (800 to 1200 hPa)'}), 400
         
         # Store the data
-        store_sensor_data(temperature, humidity, timestamp, pressure)
+        record = store_sensor_data(temperature, humidity, timestamp, pressure, station_id)
         
         return jsonify({
             'status': 'success',
-            'message': 'Sensor data received and stored',
+            'message': 'Sensor data received and stored' if record else 'Sensor data received and queued for storage',
             'timestamp': timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }), 200
         
+    except IngestQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         print(f"Error receiving sensor data: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/stream')
+def stream():
+    """Server-Sent Events stream of new readings, alert changes and forecast updates"""
+    subscriber = event_broker.subscribe()
+    return Response(
+        stream_with_context(event_broker.stream(subscriber)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/ingest/stats')
+def ingest_stats():
+    """Ingest queue depth and group-commit latency statistics"""
+    stats = ingest_queue.get_stats()
+    stats['stream'] = event_broker.get_stats()
+    return jsonify(stats)
+
 @app.route('/api/sensor_data', methods=['GET'])
 def get_sensor_info():
     """Provide information about the sensor data API endpoint"""
@@ -121,7 +486,8 @@ def get_sensor_info():
         'method': 'POST',
         'description': 'Endpoint to receive real sensor data',
         'required_fields': ['temperature', 'humidity'],
-        'optional_fields': ['timestamp'],
+        'optional_fields': ['timestamp', 'pressure', 'station_id'],
+        'batch_endpoint': '/api/sensor_data/batch',
         'example': {
             'temperature': 22.5,
             'humidity': 65.0,
@@ -132,12 +498,15 @@ def get_sensor_info():
 # Generate forecast data
 def generate_forecast():
     """Generate tomorrow's weather forecast using ML model or fallback"""
-    global current_temperature, dashboard_predictor
+    global dashboard_predictor
     
     # Try to use ML model first
     if dashboard_predictor:
         try:
-            prediction = dashboard_predictor.predict_tomorrow_weather()
+            # Whole horizon from one window read; its first day is tomorrow
+            horizon = dashboard_predictor.predict_horizon(FORECAST_HORIZON_DAYS) or []
+            # Too little history for a horizon: the single-day fallbacks still apply
+            prediction = horizon[0] if horizon else dashboard_predictor.predict_tomorrow_weather()
             if prediction and prediction.get('model_used') != 'default':
                 # Use ML model prediction
                 return {
@@ -148,12 +517,15 @@ def generate_forecast():
                     'condition': get_weather_condition(prediction['avg_temperature']),
                     'condition_icon': get_weather_icon(prediction['avg_temperature']),
                     'model_used': prediction.get('model_used', 'LSTM'),
-                    'confidence': prediction.get('confidence', 'medium')
+                    'confidence': prediction.get('confidence', 'medium'),
+                    'daily': [forecast_day(day) for day in horizon]
                 }
         except Exception as e:
             print(f"ML prediction failed: {e}")
     
-    # Fallback to statistical prediction
+    # Fallback to statistical prediction around the latest reading
+    latest = hot_state.get_latest()
+    current_temperature = latest['temperature'] if latest else 20.0
     base_temp = current_temperature + random.uniform(-3, 3)
     base_humidity = random.uniform(35, 75)
     
@@ -174,7 +546,8 @@ def generate_forecast():
         'condition': get_weather_condition(base_temp),
         'condition_icon': get_weather_icon(base_temp),
         'model_used': 'statistical',
-        'confidence': 'low'
+        'confidence': 'low',
+        'daily': []
     }
 
 def get_weather_condition(temperature):
@@ -205,25 +578,31 @@ def get_weather_icon(temperature):
 
 # Database connection
 def get_db():
-    conn = sqlite3.connect('weather.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Check out a pooled connection (close() returns it to the pool)"""
+    return get_connection(DB_PATH)
 
 # Alert threshold functions
 def get_alert_thresholds():
-    """Get current alert thresholds from database or defaults"""
+    """Get current alert thresholds (cached in the hot state, loaded from the database once)"""
+    thresholds = hot_state.get_thresholds()
+    if thresholds is not None:
+        return thresholds
+    
     conn = get_db()
     try:
         thresholds_row = conn.execute('SELECT thresholds FROM alert_settings WHERE id = 1').fetchone()
         if thresholds_row:
-            return json.loads(thresholds_row['thresholds'])
+            thresholds = json.loads(thresholds_row['thresholds'])
         else:
-            return DEFAULT_THRESHOLDS
+            thresholds = DEFAULT_THRESHOLDS
     except sqlite3.OperationalError:
         # Table doesn't exist yet
-        return DEFAULT_THRESHOLDS
+        thresholds = DEFAULT_THRESHOLDS
     finally:
         conn.close()
+    
+    hot_state.set_thresholds(thresholds)
+    return dict(thresholds)
 
 def save_alert_thresholds(thresholds):
     """Save alert thresholds to database"""
@@ -245,6 +624,14 @@ def save_alert_thresholds(thresholds):
         ''', (json.dumps(thresholds), datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
         
         conn.commit()
+        
+        # Re-evaluate the active alerts against the new thresholds
+        hot_state.set_thresholds(thresholds)
+        latest = hot_state.get_latest()
+        if latest:
+            alerts = check_alerts(latest['temperature'], latest['humidity'])
+            if hot_state.set_alerts(alerts):
+                event_broker.publish('alerts', {'alerts': alerts})
         return True
     except Exception as e:
         print(f"Error saving thresholds: {e}")
@@ -305,22 +692,71 @@ def check_alerts(temperature, humidity):
     
     return alerts
 
-# Route for main dashboard
-@app.route('/')
-def dashboard():
+# Hot state warm-up
+_warm_lock = threading.Lock()
+
+def warm_hot_state():
+    """Load the latest reading per station, alerts and forecast into memory"""
     conn = get_db()
-    latest_data = conn.execute('SELECT * FROM sensor_data ORDER BY timestamp DESC LIMIT 1').fetchone()
-    conn.close()
+    try:
+        # Saved online forecaster state, caught up with days stored since
+        online_forecaster.restore(conn)
+        
+        # SQLite returns the other columns from the row holding MAX(ts)
+        rows = conn.execute('''
+            SELECT station_id, timestamp, temperature, humidity, pressure, MAX(ts) AS ts
+            FROM sensor_data
+            GROUP BY station_id
+        ''').fetchall()
+    finally:
+        conn.close()
     
-    # Generate forecast data
-    forecast = generate_forecast()
+    hot_state.record_readings([dict(row) for row in rows if row['ts'] is not None])
     
-    # Check for alerts
-    alerts = []
-    if latest_data:
-        alerts = check_alerts(latest_data['temperature'], latest_data['humidity'])
+    latest = hot_state.get_latest()
+    hot_state.set_alerts(check_alerts(latest['temperature'], latest['humidity']) if latest else [])
     
-    return render_template('dashboard.html', data=latest_data, forecast=forecast, alerts=alerts)
+    # Stored forecast if the scheduler already produced one for tomorrow
+    conn = get_db()
+    try:
+        rows = load_forecasts(conn, forecast_date(1), FORECAST_HORIZON_DAYS)
+    finally:
+        conn.close()
+    if rows and rows[0]['date'] == forecast_date(1):
+        forecast = rows[0]
+        # Later days written by the same run
+        forecast['daily'] = [
+            {key: row[key] for key in ('date', 'temperature', 'min_temperature', 'max_temperature',
+                                       'condition', 'condition_icon', 'confidence')}
+            for row in rows if row['generated_at'] == forecast['generated_at']
+        ]
+        hot_state.set_forecast(forecast)
+    else:
+        refresh_forecast()
+    
+    forecast_scheduler.start()
+    if model_watcher:
+        model_watcher.start()
+    shadow_runner.start()
+    if firebase_backup.backup_enabled:
+        firebase_backup.start_replication_worker()
+    hot_state.mark_warmed()
+
+def ensure_hot_state():
+    """Warm the hot state on first use (e.g. when not started through init_app)"""
+    if hot_state.warmed:
+        return
+    with _warm_lock:
+        if not hot_state.warmed:
+            warm_hot_state()
+
+# Route for main dashboard
+@app.route('/')
+def dashboard():
+    # Served from memory: no database round trip
+    ensure_hot_state()
+    state = hot_state.snapshot()
+    return render_template('dashboard.html', data=state['latest'], forecast=state['forecast'], alerts=state['alerts'])
 
 # Route for settings page
 @app.route('/settings')
@@ -368,35 +804,130 @@ def save_settings():
     
     return redirect(url_for('settings'))
 
+# Chart source selection: spans up to RAW_CHART_MAX_SPAN read raw readings,
+# up to HOURLY_CHART_MAX_SPAN read hourly rollups, anything longer daily rollups
+RAW_CHART_MAX_SPAN = 2 * 24 * 3600
+HOURLY_CHART_MAX_SPAN = 90 * 24 * 3600
+DEFAULT_CHART_POINTS = 500
+MAX_CHART_POINTS = 5000
+
+def _parse_time_param(value):
+    """Parse a start/end query parameter given as epoch seconds or a timestamp string"""
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is not None:
+        if not math.isfinite(number):
+            raise ValueError(f'Invalid time value: {value}')
+        return int(number)
+    ts = to_epoch(value)
+    if ts is None:
+        raise ValueError(f'Invalid time value: {value}')
+    return ts
+
+def query_chart_series(start, end, station_id=None):
+    """Fetch (ts, temperature) arrays for a time range from the cheapest source.
+    
+    station_id=None combines all stations.
+    """
+    span = end - start
+    conn = get_db()
+    try:
+        if span <= RAW_CHART_MAX_SPAN:
+            source = 'raw'
+            if station_id is None:
+                # Served entirely from the covering ts index
+                rows = conn.execute('''
+                    SELECT ts, temperature
+                    FROM sensor_data
+                    WHERE ts BETWEEN ? AND ?
+                    ORDER BY ts
+                ''', (start, end)).fetchall()
+            else:
+                rows = conn.execute('''
+                    SELECT ts, temperature
+                    FROM sensor_data
+                    WHERE station_id = ? AND ts BETWEEN ? AND ?
+                    ORDER BY ts
+                ''', (station_id, start, end)).fetchall()
+        else:
+            source = 'hourly' if span <= HOURLY_CHART_MAX_SPAN else 'daily'
+            if station_id is None:
+                # One row per station and bucket: weight each station by its reading count
+                rows = conn.execute(f'''
+                    SELECT bucket, SUM(temperature_sum) / SUM(count)
+                    FROM {source}_rollup
+                    WHERE bucket BETWEEN ? AND ?
+                    GROUP BY bucket
+                    ORDER BY bucket
+                ''', (start, end)).fetchall()
+            else:
+                rows = conn.execute(f'''
+                    SELECT bucket, temperature_sum / count
+                    FROM {source}_rollup
+                    WHERE station_id = ? AND bucket BETWEEN ? AND ?
+                    ORDER BY bucket
+                ''', (station_id, start, end)).fetchall()
+    finally:
+        conn.close()
+    
+    series = np.array([tuple(row) for row in rows], dtype=np.float64).reshape(-1, 2)
+    return source, series[:, 0], series[:, 1]
+
 # API endpoint for chart data
 @app.route('/api/chart')
 def chart_data():
-    conn = get_db()
-    # Get last 24 hours data
-    time_threshold = datetime.now() - timedelta(hours=24)
-    data = conn.execute('''
-        SELECT timestamp, temperature, humidity 
-        FROM sensor_data 
-        WHERE timestamp >= ?
-        ORDER BY timestamp
-    ''', (time_threshold,)).fetchall()
-    conn.close()
+    """Temperature series for a time range, decimated to at most max_points.
+    
+    Query parameters: start, end (epoch seconds or 'YYYY-MM-DD HH:MM:SS',
+    default: the last 24 hours), max_points (default 500) and station
+    (default: all stations combined).
+    """
+    try:
+        end = _parse_time_param(request.args.get('end'))
+        start = _parse_time_param(request.args.get('start'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        max_points = int(request.args.get('max_points', DEFAULT_CHART_POINTS))
+    except ValueError:
+        return jsonify({'error': 'max_points must be an integer'}), 400
+    
+    if end is None:
+        end = int(time.time())
+    if start is None:
+        start = end - 24 * 3600
+    
+    if start >= end:
+        return jsonify({'error': 'start must be before end'}), 400
+    max_points = max(3, min(max_points, MAX_CHART_POINTS))
+    
+    source, ts_values, temperatures = query_chart_series(start, end, request.args.get('station') or None)
+    raw_points = len(ts_values)
+    
+    # Largest-Triangle-Three-Buckets keeps peaks while bounding the payload
+    ts_values, temperatures = lttb(ts_values, temperatures, max_points)
     
     # Process for Chart.js
-    timestamps = [row['timestamp'] for row in data]
-    temperatures = [row['temperature'] for row in data]
     return jsonify({
-        'labels': timestamps,
+        'labels': [from_epoch(int(ts)) for ts in ts_values],
         'datasets': [
             {
                 'label': 'Temperature (°C)',
-                'data': temperatures,
+                'data': [round(float(t), 2) for t in temperatures],
                 'borderColor': 'rgba(102, 126, 234, 1)',
                 'backgroundColor': 'rgba(102, 126, 234, 0.1)',
                 'fill': True,
                 'tension': 0.4
             }
-        ]
+        ],
+        'source': source,
+        'raw_points': raw_points,
+        'start': start,
+        'end': end
     })
 
 # CSV Export endpoint
@@ -404,12 +935,12 @@ def chart_data():
 def export_csv():
     conn = get_db()
     # Get all data from the last 30 days
-    time_threshold = datetime.now() - timedelta(days=30)
+    time_threshold = to_epoch(datetime.now() - timedelta(days=30))
     data = conn.execute('''
-        SELECT timestamp, temperature, humidity 
+        SELECT ts, temperature, humidity 
         FROM sensor_data 
-        WHERE timestamp >= ?
-        ORDER BY timestamp DESC
+        WHERE ts >= ?
+        ORDER BY ts DESC
     ''', (time_threshold,)).fetchall()
     conn.close()
     
@@ -422,7 +953,7 @@ def export_csv():
     
     # Write data rows
     for row in data:
-        writer.writerow([row['timestamp'], row['temperature'], row['humidity']])
+        writer.writerow([from_epoch(row['ts']), row['temperature'], row['humidity']])
     
     # Create response
     response = Response(
@@ -435,11 +966,10 @@ def export_csv():
 
 # Initialize database and start simulation
 def init_app():
-    """Initialize the database and start background simulation"""
-    global current_temperature, current_humidity
-    
-    # Create initial sample data if database is empty
+    """Initialize the database and warm the in-memory hot state"""
+    # Bring the schema up to date, then create initial sample data if database is empty
     conn = get_db()
+    migrate(conn)
     count = conn.execute('SELECT COUNT(*) as count FROM sensor_data').fetchone()['count']
     
     if count == 0:
@@ -450,6 +980,7 @@ def init_app():
         base_humidity = 55.0
         
         # Generate last 24 hours of realistic sample data
+        readings = []
         for i in range(48):  # 48 data points (every 30 minutes for 24 hours)
             minutes_ago = 30 * i
             timestamp = (datetime.now() - timedelta(minutes=minutes_ago)).strftime('%Y-%m-%d %H:%M:%S')
@@ -482,25 +1013,21 @@ def init_app():
             humidity = round(base_humidity, 1)
             
             conn.execute('''
-                INSERT INTO sensor_data (timestamp, temperature, humidity)
-                VALUES (?, ?, ?)
-            ''', (timestamp, temperature, humidity))
+                INSERT INTO sensor_data (timestamp, ts, temperature, humidity)
+                VALUES (?, ?, ?, ?)
+            ''', (timestamp, to_epoch(timestamp), temperature, humidity))
+            readings.append((to_epoch(timestamp), temperature, humidity, None, DEFAULT_STATION))
         
-        # Set current values based on latest generated data
-        current_temperature = base_temp
-        current_humidity = base_humidity
+        apply_readings(conn, readings)
         
         conn.commit()
         print("Initial realistic sample data generated!")
-    else:
-        # Get the latest values from database to continue the trend
-        latest = conn.execute('SELECT * FROM sensor_data ORDER BY timestamp DESC LIMIT 1').fetchone()
-        if latest:
-            current_temperature = latest['temperature']
-            current_humidity = latest['humidity']
     
     conn.close()
     
+    # Latest readings, alerts and forecast are served from memory from now on
+    warm_hot_state()
+    
     print("Weather dashboard initialized - Ready to receive real sensor data!")
     print("Send sensor data to: POST /api/sensor_data")
     print("Expected format: {'temperature': 22.5, 'humidity': 65.0}")
@@ -561,42 +1088,11 @@ def manual_data_entry():
 def get_latest_data():
     """API endpoint to get the latest sensor data and forecast"""
     try:
-        conn = get_db()
-        
-        # Get latest sensor data
-        latest = conn.execute('''
-            SELECT temperature, humidity, timestamp 
-            FROM sensor_data 
-            ORDER BY timestamp DESC 
-            LIMIT 1
-        ''').fetchone()
-        
-        # Try to get forecast data (may not exist)
-        forecast = None
-        try:
-            forecast = conn.execute('''
-                SELECT temperature, humidity, min_temperature, max_temperature, description 
-                FROM forecast 
-                ORDER BY date DESC 
-                LIMIT 1
-            ''').fetchone()
-        except sqlite3.OperationalError:
-            # Forecast table doesn't exist, generate a simple forecast
-            if latest:
-                forecast_data = generate_forecast()
-                forecast = {
-                    'temperature': forecast_data['temperature'],
-                    'humidity': forecast_data['humidity'], 
-                    'min_temperature': forecast_data['min_temperature'],
-                    'max_temperature': forecast_data['max_temperature'],
-                    'description': forecast_data['condition']  # Use 'condition' field as description
-                }
-        
-        # Get alerts
-        alerts = check_alerts(latest['temperature'] if latest else 20, 
-                             latest['humidity'] if latest else 50)
-        
-        conn.close()
+        # Served from memory: no database round trip
+        ensure_hot_state()
+        state = hot_state.snapshot()
+        latest = state['latest']
+        forecast = state['forecast']
         
         # Format response
         response_data = {
@@ -605,14 +1101,9 @@ def get_latest_data():
                 'humidity': latest['humidity'] if latest else '--',
                 'timestamp': latest['timestamp'] if latest else 'No data'
             },
-            'forecast': {
-                'temperature': forecast['temperature'] if forecast else '--',
-                'humidity': forecast['humidity'] if forecast else '--',
-                'min_temperature': forecast['min_temperature'] if forecast else '--',
-                'max_temperature': forecast['max_temperature'] if forecast else '--',
-                'description': forecast['description'] if forecast else 'No forecast available'
-            } if forecast else None,
-            'alerts': alerts,
+            'forecast': forecast_summary(forecast) if forecast else None,
+            'alerts': state['alerts'],
+            'stations': state['stations'],
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
@@ -624,7 +1115,7 @@ def get_latest_data():
 @app.route('/api/model_info')
 def get_model_info():
     """Get information about the current prediction model"""
-    if dashboard_predictor and dashboard_predictor.predictor:
+    if dashboard_predictor and dashboard_predictor.interpreter is not None:
         return jsonify({
             'model_available': True,
             'model_type': 'LSTM Neural Network',
@@ -632,13 +1123,23 @@ def get_model_info():
             'features': ['temperature', 'humidity', 'seasonal_patterns'],
             'prediction_horizon': '24 hours',
             'training_data_years': '50+',
-            'last_prediction': dashboard_predictor.predict_tomorrow_weather()
+            'last_prediction': dashboard_predictor.predict_tomorrow_weather(),
+            'forecast_cache': dashboard_predictor.get_cache_stats(),
+            'interpreter_pool': dashboard_predictor.interpreter_pool.get_stats(),
+            'forecast_scheduler': forecast_scheduler.get_stats(),
+            'online_forecaster': online_forecaster.get_stats(),
+            'model_watcher': model_watcher.get_stats(),
+            'model_registry': dashboard_predictor.registry.to_dict() if dashboard_predictor.registry else None,
+            'shadow_inference': shadow_runner.get_stats()
         })
     else:
         return jsonify({
             'model_available': False,
             'fallback_method': 'statistical_trends',
-            'message': 'ML model not available, using statistical forecasting'
+            'message': 'ML model not available, using statistical forecasting',
+            'forecast_scheduler': forecast_scheduler.get_stats(),
+            'online_forecaster': online_forecaster.get_stats(),
+            'model_watcher': model_watcher.get_stats() if model_watcher else None
         })
 
 # Firebase Backup Management Endpoints
@@ -658,11 +1159,13 @@ def trigger_full_backup():
         if not firebase_backup.backup_enabled:
             return jsonify({'error': 'Firebase backup not configured'}), 400
         
-        success = firebase_backup.full_backup()
+        # Runs in the background; progress is reported by /api/firebase/status
+        if not firebase_backup.start_full_backup():
+            return jsonify({'error': 'Full backup already running'}), 409
         return jsonify({
-            'status': 'success' if success else 'partial',
-            'message': 'Full backup completed' if success else 'Backup completed with some errors'
-        })
+            'status': 'started',
+            'message': 'Full backup started, progress is shown in the backup status'
+        }), 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -673,11 +1176,10 @@ def trigger_incremental_backup():
         if not firebase_backup.backup_enabled:
             return jsonify({'error': 'Firebase backup not configured'}), 400
         
-        hours = request.json.get('hours', 24) if request.json else 24
-        success = firebase_backup.incremental_backup(hours_back=hours)
+        success = firebase_backup.incremental_backup()
         return jsonify({
             'status': 'success' if success else 'partial',
-            'message': f'Incremental backup completed for last {hours} hours'
+            'message': f'Incremental backup completed up to record {firebase_backup.get_high_water_mark()}'
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -739,15 +1241,43 @@ def firebase_setup_page():
                          firebase_status=firebase_status,
                          firebase_config_path=firebase_config_path)
 
+# Scores the registry's shadow models on the active model's input windows in the background
+shadow_runner = ShadowRunner(DB_PATH)
+atexit.register(shadow_runner.stop)
+
 # Import model integration
 try:
-    from model_integration import LightweightPredictor
-    dashboard_predictor = LightweightPredictor()
+    from model_integration import LightweightPredictor, SHADOW_SAMPLE_RATE
+    dashboard_predictor = LightweightPredictor(
+        DB_PATH,
+        online_forecaster=online_forecaster,
+        pool_size=int(os.environ.get('PREDICTOR_POOL_SIZE', 2)),
+        num_threads=int(os.environ['PREDICTOR_NUM_THREADS']) if os.environ.get('PREDICTOR_NUM_THREADS') else None,
+        registry_path=os.environ.get('MODEL_REGISTRY', os.path.join('models', 'registry.json')),
+        shadow_runner=shadow_runner,
+        mae_budget=float(os.environ['MODEL_MAE_BUDGET']) if os.environ.get('MODEL_MAE_BUDGET') else None,
+        shadow_sample_rate=float(os.environ.get('SHADOW_SAMPLE_RATE', SHADOW_SAMPLE_RATE)),
+        station_id=FORECAST_STATION
+    )
     print("🧠 Model integration loaded successfully!")
 except ImportError as e:
     print(f"⚠️ Model integration unavailable: {e}")
     dashboard_predictor = None
 
+# Hot-reloads the model when its files change, then refreshes the stored forecast
+if dashboard_predictor:
+    from model_watcher import ModelWatcher
+    model_watcher = ModelWatcher(
+        dashboard_predictor,
+        interval_seconds=int(os.environ.get('MODEL_WATCH_SECONDS', 30)),
+        on_reload=forecast_scheduler.trigger
+    )
+    atexit.register(model_watcher.stop)
+else:
+    model_watcher = None
+
 if __name__ == '__main__':
     init_app()
-    app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file
+    # The ingest queue, scheduler and replication worker live in this process;
+    # the reloader would run a second copy of them against the same database
+    app.run(host='0.0.0.0', port=5001, debug=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Forecast backtest over the collected history
+Builds every rolling 30-day window from the daily rollups, predicts the
+following day with the TensorFlow Lite model and the statistical trend
+method, and reports MAE/RMSE per target plus scoring throughput.
+
+Usage: python3 backtest.py [db_path] [batch_size]
+"""
+
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from model_integration import LightweightPredictor
+
+LOOKBACK_DAYS = 30
+TARGETS = ['precipitation', 'avg_temperature', 'max_temperature', 'min_temperature']
+
+# Consecutive local days are 24h apart, give or take a DST switch
+DAY_SECONDS = 86400
+DST_TOLERANCE = 3600
+
+
+def build_windows(buckets, features, lookback=LOOKBACK_DAYS):
+    """All rolling windows over consecutive days and the day that follows each.
+
+    Returns (windows, targets, target_buckets): the (N, lookback, 6) windows,
+    the (N, 4) actual [prcp, tavg, tmax, tmin] of the next day and that day's
+    bucket. Windows spanning a gap in the data are dropped.
+    """
+    if len(features) <= lookback:
+        return np.empty((0, lookback, features.shape[1])), np.empty((0, 4)), np.empty(0, dtype=np.int64)
+
+    # Window i covers days i .. i+lookback-1 and predicts day i+lookback
+    windows = sliding_window_view(features, (lookback, features.shape[1]))[:-1, 0]
+    targets = features[lookback:, :4]
+    target_buckets = buckets[lookback:]
+
+    # Keep only windows whose lookback days and target day are consecutive
+    gaps = np.abs(np.diff(buckets) - DAY_SECONDS) > DST_TOLERANCE
+    gap_counts = np.concatenate([[0], np.cumsum(gaps)])
+    consecutive = gap_counts[lookback:] - gap_counts[:-lookback] == 0
+
+    return windows[consecutive], targets[consecutive], target_buckets[consecutive]
+
+
+def score(predicted, actual):
+    """MAE and RMSE per target"""
+    errors = predicted - actual
+    mae = np.abs(errors).mean(axis=0)
+    rmse = np.sqrt((errors ** 2).mean(axis=0))
+    return {target: {'mae': round(float(mae[i]), 3), 'rmse': round(float(rmse[i]), 3)}
+            for i, target in enumerate(TARGETS)}
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run_backtest(db_path='weather.db', batch_size=1024):
+    """Backtest every available window; returns the metrics per method"""
+    predictor = LightweightPredictor(db_path)
+
+    (buckets, features), load_seconds = _timed(lambda: predictor.get_daily_history())
+    windows, actual, target_buckets = build_windows(buckets, features)
+
+    print(f"📅 {len(features)} days of history, {len(windows)} complete {LOOKBACK_DAYS}-day windows "
+          f"(loaded in {load_seconds * 1000:.1f} ms)")
+    if len(windows) == 0:
+        print("⚠️ Not enough consecutive daily data to backtest")
+        return {}
+
+    results = {}
+
+    # The statistical method adjusts for the season of the last observed day
+    last_days = target_buckets - DAY_SECONDS
+    day_of_year = np.array([datetime.fromtimestamp(day).timetuple().tm_yday for day in last_days])
+    predicted, seconds = _timed(lambda: predictor._statistical_forecast(windows, day_of_year))
+    results['Statistical_Trend'] = {
+        'windows': len(windows),
+        'windows_per_second': round(len(windows) / max(seconds, 1e-9)),
+        'metrics': score(predicted, actual)
+    }
+
+    if predictor.interpreter_pool is not None:
+        def predict_all():
+            return np.concatenate([predictor.predict_batch(windows[i:i + batch_size])
+                                   for i in range(0, len(windows), batch_size)])
+        predicted, seconds = _timed(predict_all)
+        results['TensorFlow_Lite'] = {
+            'windows': len(windows),
+            'windows_per_second': round(len(windows) / max(seconds, 1e-9)),
+            'metrics': score(predicted, actual)
+        }
+    else:
+        print("⚠️ TensorFlow Lite model not available, only the statistical method was scored")
+
+    for method, result in results.items():
+        print(f"\n📊 {method}: {result['windows']} windows, {result['windows_per_second']} windows/s")
+        for target, metrics in result['metrics'].items():
+            print(f"   {target:<16} MAE {metrics['mae']:>7.3f}   RMSE {metrics['rmse']:>7.3f}")
+
+    return results
+
+
+if __name__ == '__main__':
+    run_backtest(
+        sys.argv[1] if len(sys.argv) > 1 else 'weather.db',
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    )
@@ -0,0 +1,178 @@
+"""
+Durable outbox and backup progress for Firebase replication
+Ingest records the ids of newly stored readings in the `backup_outbox` table
+inside its own transaction, so a reading can never be stored without being
+queued for backup. The replication worker in firebase_backup.py drains the
+outbox in batches and deletes the entries once Firestore has committed them,
+so queued readings survive restarts and network outages.
+
+Backup progress is a high-water mark on sensor_data.id in `backup_state`:
+every reading with an id at or below the mark is in Firestore. Incremental
+backups send the readings after the mark and advance it after each committed
+batch. Outbox batches acknowledged while the mark is still behind them (e.g.
+readings stored while backup was disabled) are kept as replicated id ranges
+above the mark, in the same transaction as the acknowledgement; incremental
+backups skip them and the mark absorbs them once it reaches them.
+"""
+
+import json
+import time
+
+# backup_state key of the high-water mark
+HIGH_WATER_MARK = 'sensor_data_high_water_mark'
+
+# backup_state key of the replicated sensor_data.id ranges above the mark:
+# JSON list of [first id, last id], sorted and non-overlapping
+REPLICATED_RANGES = 'sensor_data_replicated_ranges'
+
+
+def create_outbox_table(conn):
+    """Create the replication outbox table"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS backup_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sensor_id INTEGER NOT NULL      -- sensor_data.id of the reading to replicate
+        )
+    ''')
+
+
+def create_state_table(conn):
+    """Create the table holding persisted backup progress"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS backup_state (
+            name TEXT PRIMARY KEY,
+            value NOT NULL,                 -- integer id or text cursor
+            updated_at INTEGER NOT NULL     -- epoch seconds
+        )
+    ''')
+
+
+def get_state(conn, name, default=None):
+    row = conn.execute('SELECT value FROM backup_state WHERE name = ?', (name,)).fetchone()
+    return row[0] if row else default
+
+
+def set_state(conn, name, value):
+    """Store a progress value; call inside the transaction it belongs to"""
+    conn.execute(
+        'INSERT OR REPLACE INTO backup_state (name, value, updated_at) VALUES (?, ?, ?)',
+        (name, value, int(time.time()))
+    )
+
+
+def clear_state(conn, name):
+    conn.execute('DELETE FROM backup_state WHERE name = ?', (name,))
+
+
+def get_high_water_mark(conn):
+    """Highest sensor_data.id known to be backed up (0 before the first backup)"""
+    return get_state(conn, HIGH_WATER_MARK, 0)
+
+
+def _set_high_water_mark(conn, sensor_id):
+    conn.execute('''
+        INSERT INTO backup_state (name, value, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value), updated_at = excluded.updated_at
+    ''', (HIGH_WATER_MARK, sensor_id, int(time.time())))
+
+
+def get_replicated_ranges(conn):
+    """Replicated [first, last] sensor_data.id ranges above the high-water mark"""
+    return json.loads(get_state(conn, REPLICATED_RANGES, '[]'))
+
+
+def _set_replicated_ranges(conn, ranges):
+    if ranges:
+        set_state(conn, REPLICATED_RANGES, json.dumps(ranges))
+    else:
+        clear_state(conn, REPLICATED_RANGES)
+
+
+def _absorb_replicated_ranges(conn):
+    """Move the mark across replicated ranges that start at or below mark + 1"""
+    mark = get_high_water_mark(conn)
+    remaining = []
+    for first, last in get_replicated_ranges(conn):
+        if first <= mark + 1:
+            mark = max(mark, last)
+        else:
+            remaining.append([first, last])
+    _set_high_water_mark(conn, mark)
+    _set_replicated_ranges(conn, remaining)
+
+
+def advance_high_water_mark(conn, sensor_id):
+    """Move the mark forward to `sensor_id` (never backwards), then across adjoining replicated ranges"""
+    _set_high_water_mark(conn, sensor_id)
+    _absorb_replicated_ranges(conn)
+
+
+def mark_replicated(conn, sensor_ids):
+    """Record readings committed to Firestore out of id order; call inside a transaction"""
+    mark = get_high_water_mark(conn)
+    ranges = get_replicated_ranges(conn) + [[sensor_id, sensor_id] for sensor_id in sensor_ids if sensor_id > mark]
+
+    # Merge overlapping or adjoining ranges
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    _set_replicated_ranges(conn, merged)
+    _absorb_replicated_ranges(conn)
+
+
+def enqueue(conn, sensor_ids):
+    """Queue readings for replication; call inside the transaction that stored them"""
+    conn.executemany('INSERT INTO backup_outbox (sensor_id) VALUES (?)', [(sensor_id,) for sensor_id in sensor_ids])
+
+
+def peek(conn, limit=500):
+    """Oldest queued entries joined with their readings: list of (outbox id, record dict).
+
+    The record is None when the reading no longer exists; acknowledging the
+    entry drops it.
+    """
+    rows = conn.execute('''
+        SELECT o.id AS outbox_id, s.id, s.timestamp, s.temperature, s.humidity, s.pressure, s.station_id
+        FROM backup_outbox o
+        LEFT JOIN sensor_data s ON s.id = o.sensor_id
+        ORDER BY o.id
+        LIMIT ?
+    ''', (limit,)).fetchall()
+    return [
+        (row['outbox_id'], {
+            'id': row['id'],
+            'timestamp': row['timestamp'],
+            'temperature': row['temperature'],
+            'humidity': row['humidity'],
+            'pressure': row['pressure'],
+            'station_id': row['station_id']
+        } if row['id'] is not None else None)
+        for row in rows
+    ]
+
+
+def acknowledge(conn, last_outbox_id, sensor_ids=()):
+    """Remove all entries up to and including `last_outbox_id` after a successful commit.
+
+    Entries whose reading no longer exists are removed as well. The committed
+    `sensor_ids` are recorded in the same transaction: the high-water mark
+    moves across them if everything before them was already backed up,
+    otherwise they are kept as replicated ranges for incremental backups to
+    skip.
+    """
+    with conn:
+        conn.execute('DELETE FROM backup_outbox WHERE id <= ?', (last_outbox_id,))
+        mark_replicated(conn, sensor_ids)
+
+
+def first_pending_sensor_id(conn):
+    """Lowest sensor_data.id waiting in the outbox, or None"""
+    return conn.execute('SELECT MIN(sensor_id) FROM backup_outbox').fetchone()[0]
+
+
+def pending(conn):
+    """Number of queued entries"""
+    return conn.execute('SELECT COUNT(*) FROM backup_outbox').fetchone()[0]
@@ -0,0 +1,102 @@
+"""
+Microbenchmark for the TensorFlow Lite prediction path
+Compares the original per-call path (tensor detail lookups, per-element
+normalization through Python lists, set_tensor/get_tensor copies) with the
+preallocated path LightweightPredictor uses now (cached tensors, one
+vectorized normalization written straight into the input buffer).
+
+Without TensorFlow Lite only the input preparation is compared.
+
+Usage: python3 benchmark_inference.py [iterations]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from model_integration import LightweightPredictor
+
+# Default ranges the original per-element normalization used
+LEGACY_RANGES = {
+    'temperature': (-20, 50),
+    'precipitation': (0, 100)
+}
+
+
+def _legacy_normalize(value, feature_name):
+    low, high = LEGACY_RANGES[feature_name]
+    return (value - low) / (high - low)
+
+
+def legacy_prepare(window):
+    """Input preparation as originally done in _tflite_prediction"""
+    normalized_sequence = []
+    for row in window:
+        normalized_sequence.append([
+            _legacy_normalize(row[0], 'precipitation'),
+            _legacy_normalize(row[1], 'temperature'),
+            _legacy_normalize(row[2], 'temperature'),
+            _legacy_normalize(row[3], 'temperature'),
+            row[4],
+            row[5]
+        ])
+    return np.array([normalized_sequence], dtype=np.float32)
+
+
+def legacy_invoke(interpreter, window):
+    """Full original invocation: detail lookups, list normalization and tensor copies"""
+    input_details = interpreter.get_input_details()
+    output_details = interpreter.get_output_details()
+    interpreter.set_tensor(input_details[0]['index'], legacy_prepare(window))
+    interpreter.invoke()
+    return interpreter.get_tensor(output_details[0]['index'])
+
+
+def sample_window(days=30, seed=0):
+    """Synthetic (days, 6) window shaped like get_dashboard_data() output"""
+    rng = np.random.default_rng(seed)
+    tavg = 18 + 6 * rng.standard_normal(days)
+    angle = 2 * np.pi * np.arange(days) / 365
+    return np.column_stack([
+        np.zeros(days), tavg, tavg + 5, tavg - 5, np.sin(angle), np.cos(angle)
+    ])
+
+
+def time_per_call(fn, iterations):
+    """Mean microseconds per call after a short warm-up"""
+    for _ in range(min(100, iterations)):
+        fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run_benchmark(iterations=5000):
+    predictor = LightweightPredictor()
+    window = sample_window()
+    buffer = np.empty((1, 30, 6), dtype=np.float32)
+    
+    results = {
+        'prepare_before_us': time_per_call(lambda: legacy_prepare(window), iterations),
+        'prepare_after_us': time_per_call(lambda: predictor.preprocessor.transform(window, out=buffer[0]), iterations)
+    }
+    
+    if predictor.interpreter is not None:
+        interpreter = predictor.interpreter
+        results['invoke_before_us'] = time_per_call(lambda: legacy_invoke(interpreter, window), iterations)
+        results['invoke_after_us'] = time_per_call(lambda: predictor._run_model(window), iterations)
+    
+    print(f"⏱️ Prediction path microbenchmark ({iterations} iterations)")
+    print(f"   Input preparation: {results['prepare_before_us']:.1f} µs -> {results['prepare_after_us']:.1f} µs")
+    if 'invoke_before_us' in results:
+        print(f"   Full prediction:   {results['invoke_before_us']:.1f} µs -> {results['invoke_after_us']:.1f} µs")
+    else:
+        print("   Full prediction:   skipped (TensorFlow Lite model not available)")
+    
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,207 @@
+"""
+Shared SQLite connection management for the Weather Dashboard
+Keeps a small pool of long-lived, tuned connections per database file so the
+dashboard, predictor and backup service stop reconnecting on every query.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from queue import Queue, Empty, Full
+
+# Connection tuning applied to every pooled connection
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',       # Readers no longer block the writer (and vice versa)
+    'synchronous': 'NORMAL',     # Safe with WAL, fsync only at checkpoints
+    'cache_size': -8000,         # 8 MB page cache per connection (negative = KiB)
+    'mmap_size': 64 * 1024 * 1024,
+    'busy_timeout': 5000,        # Wait up to 5 s for a lock instead of failing
+    'temp_store': 'MEMORY'
+}
+
+DEFAULT_POOL_SIZE = 8
+
+# Seconds a checkout waits for a free connection once `size` are in use
+DEFAULT_POOL_TIMEOUT = 30
+
+# Text format of the display timestamp stored next to the epoch `ts` column
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def to_epoch(timestamp):
+    """Convert a local 'YYYY-MM-DD HH:MM:SS' timestamp (or datetime) to epoch seconds.
+
+    Also accepts ISO 8601 strings ('T' separator, fractional seconds).
+    Returns None if the value cannot be parsed.
+    """
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    if not isinstance(timestamp, str):
+        return None
+    try:
+        return int(datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp())
+    except ValueError:
+        pass
+    try:
+        return int(datetime.fromisoformat(timestamp).timestamp())
+    except ValueError:
+        return None
+
+
+def from_epoch(ts):
+    """Format epoch seconds as a local 'YYYY-MM-DD HH:MM:SS' timestamp"""
+    return datetime.fromtimestamp(ts).strftime(TIMESTAMP_FORMAT)
+
+
+class PooledConnection:
+    """Thin wrapper around a pooled sqlite3 connection.
+
+    Behaves like sqlite3.Connection, except that close() hands the connection
+    back to its pool instead of closing it.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        """Return the connection to the pool"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection became free within the timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of tuned SQLite connections for one database file.
+
+    At most `size` connections are checked out at once; further checkouts
+    wait up to `timeout` seconds for one to be returned and then raise
+    PoolTimeout.
+    """
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, pragmas=None, timeout=DEFAULT_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self._idle = Queue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._timeouts = 0
+
+    def _connect(self):
+        """Open and tune a new connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting while `size` are in use (opens one if none is idle)"""
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(f"No free database connection after {timeout}s ({self.size} in use)")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                conn = self._connect()
+                with self._lock:
+                    self._created += 1
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        """Return a checked-out connection to the pool, closing it if the pool is full"""
+        try:
+            if conn.in_transaction:
+                # Never hand out a connection with a half-finished transaction
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except Full:
+                conn.close()
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and back in"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
+
+    def get_stats(self):
+        return {
+            'db_path': self.db_path,
+            'pool_size': self.size,
+            'idle': self._idle.qsize(),
+            'in_use': self._in_use,
+            'connections_opened': self._created,
+            'checkout_timeouts': self._timeouts
+        }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path='weather.db'):
+    """Get the shared pool for a database file"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(key)
+            _pools[key] = pool
+        return pool
+
+
+def get_connection(db_path='weather.db'):
+    """Check out a pooled connection; call close() to return it"""
+    return get_pool(db_path).acquire()
@@ -0,0 +1,54 @@
+"""
+Time-series decimation for dashboard charts
+Largest-Triangle-Three-Buckets (LTTB) keeps the visual shape of a series,
+including its peaks, while bounding the number of points sent to the browser.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points LTTB keeps when reducing (x, y) to `threshold` points.
+
+    x must be sorted ascending. The first and last points are always kept.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Triangle areas for every candidate in this bucket at once
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def lttb(x, y, threshold):
+    """Downsample (x, y) to at most `threshold` points. Returns (x, y) arrays."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    indices = lttb_indices(x, y, threshold)
+    return x[indices], y[indices]
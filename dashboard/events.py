@@ -0,0 +1,80 @@
+"""
+Server-Sent Events broker for the Weather Dashboard
+Fans out events published after each ingest commit (new readings, changed
+alerts, forecast updates) to every connected browser.
+"""
+
+import json
+import threading
+from queue import Queue, Empty, Full
+
+
+class EventBroker:
+    """Publish/subscribe hub with one bounded queue per connected client"""
+
+    def __init__(self, max_queue_size=256, heartbeat_seconds=15):
+        self.max_queue_size = max_queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._published = 0
+        self._dropped = 0
+
+    def subscribe(self):
+        """Register a new client and return its event queue"""
+        subscriber = Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        """Send an event to every subscriber without ever blocking the caller.
+
+        A client that falls behind loses its oldest queued event rather than
+        slowing down ingest.
+        """
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._published += 1
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except Full:
+                try:
+                    subscriber.get_nowait()
+                    self._dropped += 1
+                except Empty:
+                    pass
+                try:
+                    subscriber.put_nowait(message)
+                except Full:
+                    pass
+
+    def stream(self, subscriber):
+        """Generator of SSE messages for one client; unsubscribes when closed"""
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield subscriber.get(timeout=self.heartbeat_seconds)
+                except Empty:
+                    # Comment line keeps proxies from closing the idle connection
+                    # and lets the server notice disconnected clients
+                    yield ": heartbeat\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'events_published': self._published,
+                'events_dropped': self._dropped
+            }
@@ -5,23 +5,91 @@ Handles automatic backup of sensor data to Firebase Firestore
 
 import firebase_admin
 from firebase_admin import credentials, firestore
-import sqlite3
+from google.api_core import exceptions as api_exceptions
+from google.cloud.firestore_v1.field_path import FieldPath
 import json
 import logging
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 import threading
 import time
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+
+import backup_outbox
+from database import get_connection, to_epoch
+from rollups import apply_readings
+from hot_state import DEFAULT_STATION
+
+# Firestore batch write limit
+BATCH_SIZE = 500
+
+# Longest wait between replication retries while Firestore is unreachable
+MAX_RETRY_SECONDS = 300
+
+# Seconds the record counts in the backup status are reused
+STATUS_TTL_SECONDS = 60
+
+# backup_state key of the last record of an unfinished full backup
+FULL_BACKUP_CHECKPOINT = 'full_backup_checkpoint'
+
+# Concurrent batch commits during a full backup
+FULL_BACKUP_WORKERS = 4
+
+# backup_state key of an unfinished restore, and documents read per restore page
+RESTORE_CHECKPOINT = 'restore_checkpoint'
+RESTORE_PAGE_SIZE = 500
+
+# Errors meaning Firestore wants us to slow down (the batch is retried)
+THROTTLE_ERRORS = (
+    api_exceptions.ResourceExhausted,
+    api_exceptions.TooManyRequests,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.Aborted
+)
+
+class AdaptiveRateLimiter:
+    """Delay between batch commits that adapts to server responses
+    
+    The delay doubles (from `min_backoff`, up to `max_delay`) whenever
+    Firestore throttles a commit and halves after every successful one, so a
+    backup runs at full speed until the server pushes back.
+    """
+    
+    def __init__(self, min_backoff: float = 0.25, max_delay: float = 30.0):
+        self.min_backoff = min_backoff
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        delay = self.delay
+        if delay:
+            time.sleep(delay)
+    
+    def on_success(self):
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.min_backoff / 8 else 0.0
+    
+    def on_throttle(self):
+        with self._lock:
+            self.throttled += 1
+            self.delay = min(max(self.delay * 2, self.min_backoff), self.max_delay)
 
 class FirebaseBackupService:
-    def __init__(self, config_path: str = None, db_path: str = "weather.db"):
+    def __init__(self, config_path: str = None, db_path: str = "weather.db",
+                 replication_interval: float = 5.0, status_ttl: float = STATUS_TTL_SECONDS):
         """
         Initialize Firebase Backup Service
         
         Args:
             config_path: Path to Firebase service account JSON file
             db_path: Path to SQLite database
+            replication_interval: Seconds between outbox drains when idle
+            status_ttl: Seconds the record counts in the backup status are cached
         """
         self.db_path = db_path
         self.config_path = config_path
@@ -30,6 +98,33 @@ class FirebaseBackupService:
         self.backup_thread = None
         self.stop_backup = threading.Event()
         
+        # Outbox replication worker (see backup_outbox.py)
+        self.replication_interval = replication_interval
+        self.replication_thread = None
+        self.stop_replication = threading.Event()
+        self.replication_wake = threading.Event()
+        self.replication_stats = {
+            'replicated': 0,
+            'dropped': 0,       # queued readings deleted before they were replicated
+            'batches': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'retry_in_seconds': 0,
+            'last_success': None,
+            'last_error': None
+        }
+        
+        # Cached record counts for get_backup_status, refreshed by the replication worker
+        self.status_ttl = status_ttl
+        self._sync_status = None
+        self._sync_status_time = 0.0
+        self._status_lock = threading.Lock()
+        
+        # Progress of the current (or last) full backup
+        self.full_backup_thread = None
+        self._full_backup_lock = threading.Lock()
+        self.full_backup_progress = {'running': False}
+        
         # Setup logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -58,20 +153,19 @@ class FirebaseBackupService:
     def get_local_data(self, start_date: str = None, end_date: str = None) -> List[Dict]:
         """Retrieve data from local SQLite database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = get_connection(self.db_path)
             
             query = "SELECT * FROM sensor_data"
             params = []
             
             if start_date and end_date:
-                query += " WHERE timestamp BETWEEN ? AND ?"
-                params = [start_date, end_date]
+                query += " WHERE ts BETWEEN ? AND ?"
+                params = [to_epoch(start_date), to_epoch(end_date)]
             elif start_date:
-                query += " WHERE timestamp >= ?"
-                params = [start_date]
+                query += " WHERE ts >= ?"
+                params = [to_epoch(start_date)]
             
-            query += " ORDER BY timestamp ASC"
+            query += " ORDER BY ts ASC"
             
             cursor = conn.execute(query, params)
             rows = cursor.fetchall()
@@ -85,7 +179,8 @@ class FirebaseBackupService:
                     'timestamp': row['timestamp'],
                     'temperature': row['temperature'],
                     'humidity': row['humidity'],
-                    'pressure': row['pressure'] if row['pressure'] else None
+                    'pressure': row['pressure'] if row['pressure'] else None,
+                    'station_id': row['station_id']
                 })
             
             return data
@@ -94,27 +189,40 @@ class FirebaseBackupService:
             self.logger.error(f"Error retrieving local data: {e}")
             return []
     
+    @staticmethod
+    def _document_id(record: Dict) -> str:
+        """Firestore document ID: the timestamp, prefixed by the station for non-default stations"""
+        doc_id = record['timestamp'].replace(' ', '_').replace(':', '-')
+        station = record.get('station_id') or DEFAULT_STATION
+        return doc_id if station == DEFAULT_STATION else f"{station}_{doc_id}"
+    
+    @staticmethod
+    def _document_data(record: Dict) -> Dict:
+        """Firestore document body for a local record"""
+        doc_data = {
+            'local_id': record['id'],
+            'timestamp': record['timestamp'],
+            'temperature': record['temperature'],
+            'humidity': record['humidity'],
+            'station_id': record.get('station_id') or DEFAULT_STATION,
+            'backup_time': datetime.now().isoformat(),
+            'source': 'weather_dashboard'
+        }
+        
+        if record.get('pressure'):
+            doc_data['pressure'] = record['pressure']
+        
+        return doc_data
+    
     def backup_single_record(self, record: Dict) -> bool:
         """Backup a single sensor record to Firebase"""
         if not self.backup_enabled or not self.db:
             return False
         
         try:
-            # Use timestamp as document ID to avoid duplicates
-            doc_id = f"{record['timestamp'].replace(' ', '_').replace(':', '-')}"
-            
-            # Prepare document data
-            doc_data = {
-                'local_id': record['id'],
-                'timestamp': record['timestamp'],
-                'temperature': record['temperature'],
-                'humidity': record['humidity'],
-                'backup_time': datetime.now().isoformat(),
-                'source': 'weather_dashboard'
-            }
-            
-            if record.get('pressure'):
-                doc_data['pressure'] = record['pressure']
+            # Use timestamp (and station) as document ID to avoid duplicates
+            doc_id = self._document_id(record)
+            doc_data = self._document_data(record)
             
             # Store in Firestore
             self.db.collection('sensor_data').document(doc_id).set(doc_data, merge=True)
@@ -125,36 +233,22 @@ class FirebaseBackupService:
             self.logger.error(f"Error backing up record {record['id']}: {e}")
             return False
     
+    def _commit_batch(self, records: List[Dict]) -> int:
+        """Write up to 500 records in one Firestore batch commit (raises on failure)"""
+        batch = self.db.batch()
+        for record in records:
+            doc_ref = self.db.collection('sensor_data').document(self._document_id(record))
+            batch.set(doc_ref, self._document_data(record), merge=True)
+        batch.commit()
+        return len(records)
+    
     def backup_batch(self, records: List[Dict]) -> int:
         """Backup multiple records in a batch"""
         if not self.backup_enabled or not self.db:
             return 0
         
-        success_count = 0
-        batch = self.db.batch()
-        
         try:
-            for record in records:
-                doc_id = f"{record['timestamp'].replace(' ', '_').replace(':', '-')}"
-                doc_ref = self.db.collection('sensor_data').document(doc_id)
-                
-                doc_data = {
-                    'local_id': record['id'],
-                    'timestamp': record['timestamp'],
-                    'temperature': record['temperature'],
-                    'humidity': record['humidity'],
-                    'backup_time': datetime.now().isoformat(),
-                    'source': 'weather_dashboard'
-                }
-                
-                if record.get('pressure'):
-                    doc_data['pressure'] = record['pressure']
-                
-                batch.set(doc_ref, doc_data, merge=True)
-                success_count += 1
-            
-            # Commit the batch
-            batch.commit()
+            success_count = self._commit_batch(records)
             self.logger.info(f"Successfully backed up {success_count} records in batch")
             return success_count
             
@@ -162,60 +256,346 @@ class FirebaseBackupService:
             self.logger.error(f"Error in batch backup: {e}")
             return 0
     
-    def full_backup(self) -> bool:
-        """Perform a full backup of all local data"""
+    @staticmethod
+    def _iter_record_batches(conn, after_id: int, before_id: int, batch_size: int = BATCH_SIZE) -> Iterator[List[Dict]]:
+        """Stream records with after_id < id < before_id in id order, one batch at a time"""
+        while True:
+            rows = conn.execute('''
+                SELECT id, timestamp, temperature, humidity, pressure, station_id
+                FROM sensor_data
+                WHERE id > ? AND id < ?
+                ORDER BY id
+                LIMIT ?
+            ''', (after_id, before_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            after_id = rows[-1]['id']
+    
+    def enqueue_records(self, conn, sensor_ids) -> None:
+        """Queue stored readings for replication inside the caller's transaction"""
+        if self.backup_enabled:
+            backup_outbox.enqueue(conn, sensor_ids)
+    
+    def notify_replication(self) -> None:
+        """Wake the replication worker after new readings were committed"""
+        self.replication_wake.set()
+    
+    def replicate_pending(self) -> Optional[int]:
+        """Send the oldest queued readings (up to one batch) to Firestore.
+        
+        Returns the number of outbox entries handled (replicated, or dropped
+        because their reading was deleted), or None if the batch failed and
+        stays queued.
+        """
+        conn = get_connection(self.db_path)
+        try:
+            entries = backup_outbox.peek(conn, BATCH_SIZE)
+            if not entries:
+                return 0
+            
+            # Readings deleted since they were queued are dropped with the batch
+            records = [record for _, record in entries if record is not None]
+            if records and self.backup_batch(records) < len(records):
+                return None
+            
+            backup_outbox.acknowledge(conn, entries[-1][0], [record['id'] for record in records])
+        finally:
+            conn.close()
+        
+        self.replication_stats['replicated'] += len(records)
+        self.replication_stats['dropped'] += len(entries) - len(records)
+        self.replication_stats['batches'] += 1
+        self.replication_stats['last_success'] = datetime.now().isoformat()
+        return len(entries)
+    
+    def start_replication_worker(self) -> bool:
+        """Start the outbox replication worker"""
+        if not self.backup_enabled:
+            self.logger.warning("Cannot start replication - Firebase not initialized")
+            return False
+        
+        if self.replication_thread and self.replication_thread.is_alive():
+            return False
+        
+        self.stop_replication.clear()
+        self.replication_thread = threading.Thread(
+            target=self._replication_worker,
+            name='firebase-replication',
+            daemon=True
+        )
+        self.replication_thread.start()
+        self.logger.info("Started Firebase replication worker")
+        return True
+    
+    def stop_replication_worker(self):
+        """Stop the outbox replication worker (queued readings stay in the outbox)"""
+        self.stop_replication.set()
+        self.replication_wake.set()
+        if self.replication_thread:
+            self.replication_thread.join(timeout=5)
+    
+    def _replication_worker(self):
+        """Drain the outbox in batches, backing off exponentially while offline"""
+        stats = self.replication_stats
+        status_stale = True
+        while not self.stop_replication.is_set():
+            try:
+                replicated = self.replicate_pending()
+            except Exception as e:
+                self.logger.error(f"Error in replication worker: {e}")
+                stats['last_error'] = str(e)
+                replicated = None
+            
+            if replicated is None:
+                stats['failures'] += 1
+                stats['consecutive_failures'] += 1
+                delay = min(self.replication_interval * 2 ** stats['consecutive_failures'], MAX_RETRY_SECONDS)
+                stats['retry_in_seconds'] = delay
+                self.stop_replication.wait(timeout=delay)
+                continue
+            
+            stats['consecutive_failures'] = 0
+            stats['retry_in_seconds'] = 0
+            status_stale = status_stale or replicated > 0
+            if replicated == BATCH_SIZE:
+                continue  # More entries are waiting
+            
+            # Idle: keep the cached status fresh, then wait for new readings or the next interval
+            if status_stale and time.monotonic() - self._sync_status_time >= self.status_ttl:
+                try:
+                    self.refresh_sync_status()
+                    status_stale = False
+                except Exception as e:
+                    self.logger.error(f"Error refreshing backup status: {e}")
+            self.replication_wake.wait(timeout=self.replication_interval)
+            self.replication_wake.clear()
+    
+    def get_replication_status(self) -> Dict:
+        """Replication worker statistics and outbox size"""
+        status = dict(self.replication_stats)
+        status['running'] = bool(self.replication_thread and self.replication_thread.is_alive())
+        try:
+            conn = get_connection(self.db_path)
+            try:
+                status['pending'] = backup_outbox.pending(conn)
+                status['high_water_mark'] = backup_outbox.get_high_water_mark(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            status['pending'] = None
+            status['error'] = str(e)
+        return status
+    
+    def _commit_with_retry(self, records: List[Dict], limiter: AdaptiveRateLimiter, attempts: int = 8) -> int:
+        """Commit a batch, backing off and retrying while Firestore throttles"""
+        for attempt in range(attempts):
+            limiter.wait()
+            try:
+                committed = self._commit_batch(records)
+                limiter.on_success()
+                return committed
+            except THROTTLE_ERRORS as e:
+                limiter.on_throttle()
+                if attempt == attempts - 1:
+                    raise
+                self.logger.warning(f"Firestore throttled batch commit, retrying in {limiter.delay:.2f}s: {e}")
+    
+    def full_backup(self, workers: int = FULL_BACKUP_WORKERS, resume: bool = True) -> bool:
+        """Perform a full backup of all local data
+        
+        Records are streamed from the database one batch at a time and
+        committed by a small thread pool, paced by an adaptive rate limiter.
+        The last record of the longest completed prefix is checkpointed after
+        each batch, so an interrupted backup resumes where it stopped unless
+        `resume` is False.
+        """
         if not self.backup_enabled:
             self.logger.warning("Firebase backup not enabled")
             return False
         
+        progress = self._claim_full_backup()
+        if progress is None:
+            return False
+        return self._run_full_backup(progress, workers, resume)
+    
+    def _claim_full_backup(self) -> Optional[Dict]:
+        """Mark a full backup as running; returns its progress dict, or None if one already runs"""
+        with self._full_backup_lock:
+            if self.full_backup_progress.get('running'):
+                self.logger.warning("Full backup already running")
+                return None
+            progress = {'running': True, 'started_at': datetime.now().isoformat(), 'backed_up': 0}
+            self.full_backup_progress = progress
+            return progress
+    
+    def _run_full_backup(self, progress: Dict, workers: int, resume: bool) -> bool:
+        """Body of full_backup, run after _claim_full_backup succeeded"""
+        conn = get_connection(self.db_path)
         try:
-            self.logger.info("Starting full backup...")
-            data = self.get_local_data()
+            checkpoint = backup_outbox.get_state(conn, FULL_BACKUP_CHECKPOINT) if resume else None
+            start_id = checkpoint or 0
+            last_id = conn.execute('SELECT MAX(id) FROM sensor_data').fetchone()[0] or 0
+            progress.update({
+                'resumed_from': checkpoint,
+                'checkpoint': start_id,
+                'total': conn.execute(
+                    'SELECT COUNT(*) FROM sensor_data WHERE id > ? AND id <= ?', (start_id, last_id)
+                ).fetchone()[0]
+            })
+            self.logger.info(f"Starting full backup of {progress['total']} records"
+                             + (f" (resuming after record {checkpoint})" if checkpoint else ""))
             
-            if not data:
-                self.logger.warning("No data to backup")
-                return True
+            limiter = AdaptiveRateLimiter()
+            # (last id, record count, future) in submission order
+            in_flight = deque()
+            failed = None
             
-            # Backup in batches of 500 (Firestore limit)
-            batch_size = 500
-            total_backed_up = 0
+            def settle(block):
+                """Collect finished batches and advance the checkpoint over the completed prefix"""
+                nonlocal failed
+                if block and in_flight:
+                    wait([future for _, _, future in in_flight], return_when=FIRST_COMPLETED)
+                advanced = False
+                while in_flight and in_flight[0][2].done():
+                    batch_last_id, count, future = in_flight.popleft()
+                    error = future.exception()
+                    if error is not None:
+                        failed = failed or error
+                        continue
+                    if failed is None:
+                        progress['checkpoint'] = batch_last_id
+                        progress['backed_up'] += count
+                        advanced = True
+                if advanced:
+                    with conn:
+                        backup_outbox.set_state(conn, FULL_BACKUP_CHECKPOINT, progress['checkpoint'])
+                progress['rate_delay_seconds'] = round(limiter.delay, 3)
+                progress['throttled'] = limiter.throttled
             
-            for i in range(0, len(data), batch_size):
-                batch_data = data[i:i + batch_size]
-                backed_up = self.backup_batch(batch_data)
-                total_backed_up += backed_up
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='firebase-full-backup') as pool:
+                for records in self._iter_record_batches(conn, start_id, last_id + 1):
+                    # Bounded read-ahead: at most two batches per worker in memory
+                    while len(in_flight) >= workers * 2 and failed is None:
+                        settle(block=True)
+                    if failed is not None:
+                        break
+                    future = pool.submit(self._commit_with_retry, records, limiter)
+                    in_flight.append((records[-1]['id'], len(records), future))
+                    settle(block=False)
                 
-                # Small delay between batches
-                time.sleep(0.5)
+                while in_flight:
+                    settle(block=True)
+            
+            if failed is not None:
+                raise failed
             
-            self.logger.info(f"Full backup completed: {total_backed_up}/{len(data)} records")
-            return total_backed_up == len(data)
+            # Everything up to the newest record is now backed up
+            with conn:
+                backup_outbox.clear_state(conn, FULL_BACKUP_CHECKPOINT)
+                backup_outbox.advance_high_water_mark(conn, last_id)
+            
+            self.logger.info(f"Full backup completed: {progress['backed_up']}/{progress['total']} records")
+            progress['finished_at'] = datetime.now().isoformat()
+            self._sync_status_time = 0.0  # Recount on the next status request
+            return True
             
         except Exception as e:
             self.logger.error(f"Error in full backup: {e}")
+            progress['error'] = str(e)
+            return False
+        finally:
+            conn.close()
+            progress['running'] = False
+    
+    def start_full_backup(self, workers: int = FULL_BACKUP_WORKERS, resume: bool = True) -> bool:
+        """Run full_backup in a background thread; progress is in get_backup_status()
+        
+        Returns False if Firebase is not enabled or a full backup is already
+        running. The backup is marked as running before this returns, so of
+        two concurrent calls only one starts a backup.
+        """
+        if not self.backup_enabled:
             return False
+        progress = self._claim_full_backup()
+        if progress is None:
+            return False
+        
+        try:
+            self.full_backup_thread = threading.Thread(
+                target=self._run_full_backup,
+                args=(progress, workers, resume),
+                name='firebase-full-backup',
+                daemon=True
+            )
+            self.full_backup_thread.start()
+        except Exception:
+            progress['running'] = False
+            raise
+        return True
+    
+    def get_high_water_mark(self) -> int:
+        """Highest sensor_data.id known to be backed up"""
+        conn = get_connection(self.db_path)
+        try:
+            return backup_outbox.get_high_water_mark(conn)
+        finally:
+            conn.close()
     
-    def incremental_backup(self, hours_back: int = 24) -> bool:
-        """Backup only recent data"""
+    def incremental_backup(self) -> bool:
+        """Backup the records stored after the high-water mark, in id order
+        
+        Records are read one batch at a time and the persisted mark advances
+        after each committed batch, so every record is sent once and a run
+        after an outage catches up on everything it missed. Records still
+        waiting in the replication outbox are left to the replication worker,
+        and ranges it already replicated are skipped.
+        """
         if not self.backup_enabled:
             return False
         
+        conn = get_connection(self.db_path)
         try:
-            # Get data from last N hours
-            start_time = (datetime.now() - timedelta(hours=hours_back)).strftime('%Y-%m-%d %H:%M:%S')
-            data = self.get_local_data(start_date=start_time)
+            mark = backup_outbox.get_high_water_mark(conn)
+            total = 0
             
-            if not data:
-                self.logger.info("No recent data to backup")
-                return True
+            no_limit = 2 ** 63 - 1
+            while True:
+                # Send the gap up to the next pending or already replicated reading
+                first_pending = backup_outbox.first_pending_sensor_id(conn)
+                ranges = backup_outbox.get_replicated_ranges(conn)
+                end = min(first_pending if first_pending is not None else no_limit,
+                          ranges[0][0] if ranges else no_limit)
+                
+                for records in self._iter_record_batches(conn, mark, end):
+                    if self.backup_batch(records) < len(records):
+                        self.logger.warning(f"Incremental backup stopped at record {mark} after {total} records")
+                        return False
+                    
+                    mark = records[-1]['id']
+                    with conn:
+                        backup_outbox.advance_high_water_mark(conn, mark)
+                    total += len(records)
+                
+                if end == no_limit:
+                    break
+                # Everything below `end` is backed up now; the mark also absorbs
+                # a replicated range starting there
+                if end - 1 > mark:
+                    with conn:
+                        backup_outbox.advance_high_water_mark(conn, end - 1)
+                if not ranges or ranges[0][0] != end:
+                    break
+                mark = backup_outbox.get_high_water_mark(conn)
             
-            success = self.backup_batch(data)
-            self.logger.info(f"Incremental backup: {success}/{len(data)} records")
-            return success == len(data)
+            self.logger.info(f"Incremental backup: {total} new records (high-water mark {mark})")
+            return True
             
         except Exception as e:
             self.logger.error(f"Error in incremental backup: {e}")
             return False
+        finally:
+            conn.close()
     
     def start_automatic_backup(self, interval_minutes: int = 60):
         """Start automatic backup service"""
@@ -248,8 +628,8 @@ class FirebaseBackupService:
         """Worker thread for automatic backup"""
         while not self.stop_backup.is_set():
             try:
-                # Perform incremental backup every interval
-                self.incremental_backup(hours_back=interval_minutes * 60 // 60 + 1)
+                # Back up everything stored since the last run
+                self.incremental_backup()
                 
                 # Wait for next interval or stop signal
                 self.stop_backup.wait(timeout=interval_minutes * 60)
@@ -259,69 +639,176 @@ class FirebaseBackupService:
                 # Wait a bit before retrying
                 self.stop_backup.wait(timeout=300)  # 5 minutes
     
-    def get_backup_status(self) -> Dict:
-        """Get current backup status and statistics"""
+    def refresh_sync_status(self) -> Dict:
+        """Count local and Firebase records and cache the result
+        
+        Uses COUNT(*)/MAX(id) locally and a Firestore aggregation count query
+        remotely, so neither side is downloaded.
+        """
+        conn = get_connection(self.db_path)
+        try:
+            local_records, max_id = conn.execute('SELECT COUNT(*), MAX(id) FROM sensor_data').fetchone()
+            high_water_mark = backup_outbox.get_high_water_mark(conn)
+            pending = backup_outbox.pending(conn)
+        finally:
+            conn.close()
+        
+        firebase_records = self.db.collection('sensor_data').count().get()[0][0].value
+        
+        # Synced when every local record is at or below the high-water mark; the
+        # counts can differ since readings sharing a timestamp share a document
+        sync_status = {
+            'local_records': local_records,
+            'firebase_records': int(firebase_records),
+            'sync_status': 'synced' if pending == 0 and high_water_mark >= (max_id or 0) else 'out_of_sync',
+            'counted_at': datetime.now().isoformat()
+        }
+        with self._status_lock:
+            self._sync_status = sync_status
+            self._sync_status_time = time.monotonic()
+        return sync_status
+    
+    def get_backup_status(self, max_age: float = None) -> Dict:
+        """Get current backup status and statistics
+        
+        Record counts are reused for up to `max_age` seconds (the status TTL
+        by default) instead of being recounted on every call.
+        """
         status = {
             'enabled': self.backup_enabled,
             'automatic_running': self.backup_thread and self.backup_thread.is_alive(),
+            'replication': self.get_replication_status(),
+            'full_backup': dict(self.full_backup_progress),
             'last_check': datetime.now().isoformat()
         }
         
         if self.backup_enabled:
+            max_age = self.status_ttl if max_age is None else max_age
             try:
-                # Get local data count
-                local_data = self.get_local_data()
-                status['local_records'] = len(local_data)
-                
-                # Get Firebase data count
-                firebase_count = len(self.db.collection('sensor_data').get())
-                status['firebase_records'] = firebase_count
-                status['sync_status'] = 'synced' if len(local_data) == firebase_count else 'out_of_sync'
+                with self._status_lock:
+                    sync_status = self._sync_status
+                    fresh = time.monotonic() - self._sync_status_time < max_age
+                if sync_status is None or not fresh:
+                    sync_status = self.refresh_sync_status()
+                status.update(sync_status)
                 
             except Exception as e:
                 status['error'] = str(e)
         
         return status
     
-    def restore_from_firebase(self, start_date: str = None, end_date: str = None) -> int:
-        """Restore data from Firebase to local database (emergency recovery)"""
+    def _restore_page(self, conn, docs: List) -> int:
+        """Insert one page of Firestore documents that are not stored locally yet
+        
+        A reading is identified by (station, timestamp), so documents already
+        present locally (or earlier in the page) are skipped and repeated
+        restores never duplicate rows. Must be called inside the page's
+        transaction. Returns the number of rows inserted.
+        """
+        rows = []
+        for doc in docs:
+            data = doc.to_dict()
+            try:
+                ts = to_epoch(data['timestamp'])
+                rows.append((
+                    data['timestamp'],
+                    ts,
+                    data['temperature'],
+                    data['humidity'],
+                    data.get('pressure'),
+                    data.get('station_id') or DEFAULT_STATION
+                ))
+            except Exception as e:
+                self.logger.error(f"Error restoring record {doc.id}: {e}")
+        
+        known = [row[1] for row in rows if row[1] is not None]
+        if not known:
+            return 0
+        
+        # Keys already stored in the page's time range (one indexed range scan)
+        existing = {tuple(row) for row in conn.execute(
+            'SELECT station_id, ts FROM sensor_data WHERE ts BETWEEN ? AND ?', (min(known), max(known))
+        )}
+        new_rows = []
+        for row in rows:
+            key = (row[5], row[1])
+            if row[1] is not None and key not in existing:
+                existing.add(key)
+                new_rows.append(row)
+        if not new_rows:
+            return 0
+        
+        # Restored rows need no backup: keep the high-water mark past them if it was current
+        mark = backup_outbox.get_high_water_mark(conn)
+        max_id = conn.execute('SELECT MAX(id) FROM sensor_data').fetchone()[0] or 0
+        
+        conn.executemany('''
+            INSERT INTO sensor_data (timestamp, ts, temperature, humidity, pressure, station_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', new_rows)
+        
+        # Restored rows count towards the hourly/daily rollups too
+        apply_readings(conn, [row[1:] for row in new_rows])
+        
+        if mark >= max_id:
+            backup_outbox.advance_high_water_mark(conn, conn.execute('SELECT MAX(id) FROM sensor_data').fetchone()[0])
+        return len(new_rows)
+    
+    def restore_from_firebase(self, start_date: str = None, end_date: str = None,
+                              page_size: int = RESTORE_PAGE_SIZE) -> int:
+        """Restore data from Firebase to local database (emergency recovery)
+        
+        Documents are read in pages of `page_size` ordered by timestamp, using
+        a start_after cursor. Each page is inserted with executemany in its own
+        transaction together with a checkpoint of its last document, so a
+        crashed restore of the same date range resumes after the last page.
+        """
         if not self.backup_enabled:
             return 0
         
+        conn = get_connection(self.db_path)
         try:
-            # Query Firebase
             query = self.db.collection('sensor_data')
             
             if start_date:
                 query = query.where('timestamp', '>=', start_date)
             if end_date:
                 query = query.where('timestamp', '<=', end_date)
+            query = query.order_by('timestamp').order_by(FieldPath.document_id())
             
-            docs = query.get()
+            # Resume an interrupted restore of the same range
+            restore_range = {'start_date': start_date, 'end_date': end_date}
+            checkpoint = backup_outbox.get_state(conn, RESTORE_CHECKPOINT)
+            cursor = None
+            if checkpoint:
+                checkpoint = json.loads(checkpoint)
+                if checkpoint['range'] == restore_range:
+                    cursor = self.db.collection('sensor_data').document(checkpoint['last_document']).get()
+                    if cursor.exists:
+                        self.logger.info(f"Resuming restore after document {cursor.id}")
+                    else:
+                        cursor = None
             
-            # Restore to local database
-            conn = sqlite3.connect(self.db_path)
             restored_count = 0
+            while True:
+                page_query = query.start_after(cursor) if cursor is not None else query
+                docs = list(page_query.limit(page_size).stream())
+                if not docs:
+                    break
+                
+                cursor = docs[-1]
+                with conn:
+                    restored_count += self._restore_page(conn, docs)
+                    backup_outbox.set_state(conn, RESTORE_CHECKPOINT, json.dumps({
+                        'range': restore_range,
+                        'last_document': cursor.id
+                    }))
+                
+                if len(docs) < page_size:
+                    break
             
-            for doc in docs:
-                data = doc.to_dict()
-                try:
-                    conn.execute('''
-                        INSERT OR REPLACE INTO sensor_data 
-                        (timestamp, temperature, humidity, pressure)
-                        VALUES (?, ?, ?, ?)
-                    ''', (
-                        data['timestamp'],
-                        data['temperature'],
-                        data['humidity'],
-                        data.get('pressure')
-                    ))
-                    restored_count += 1
-                except Exception as e:
-                    self.logger.error(f"Error restoring record: {e}")
-            
-            conn.commit()
-            conn.close()
+            with conn:
+                backup_outbox.clear_state(conn, RESTORE_CHECKPOINT)
             
             self.logger.info(f"Restored {restored_count} records from Firebase")
             return restored_count
@@ -329,6 +816,8 @@ class FirebaseBackupService:
         except Exception as e:
             self.logger.error(f"Error restoring from Firebase: {e}")
             return 0
+        finally:
+            conn.close()
 
 
 # Convenience functions for integration
@@ -0,0 +1,136 @@
+"""
+Forecast table and background forecast scheduler
+Precomputes the forecast for the coming days on a fixed interval, when a new
+day of data closes and when the date rolls over, and stores one row per day in
+the `forecast` table so the read path is a single primary-key range lookup.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+FORECAST_COLUMNS = (
+    'date', 'temperature', 'min_temperature', 'max_temperature', 'humidity',
+    'condition', 'condition_icon', 'model_used', 'model_id', 'confidence',
+    'data_version', 'generated_at'
+)
+
+
+def create_forecast_table(conn):
+    """Create the forecast table if it doesn't exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS forecast (
+            date TEXT PRIMARY KEY,              -- forecast day, local YYYY-MM-DD
+            temperature FLOAT NOT NULL,
+            min_temperature FLOAT NOT NULL,
+            max_temperature FLOAT NOT NULL,
+            humidity FLOAT,
+            condition TEXT,
+            condition_icon TEXT,
+            model_used TEXT,
+            model_id TEXT,                      -- model file and version that produced it
+            confidence TEXT,
+            data_version INTEGER,               -- newest daily rollup bucket used
+            generated_at INTEGER NOT NULL       -- epoch seconds
+        )
+    ''')
+
+
+def forecast_date(days_ahead=1):
+    """Local date string of the day `days_ahead` days from now"""
+    return (datetime.now() + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+
+
+def save_forecasts(conn, forecasts):
+    """Insert or replace one row per forecast day in a single transaction"""
+    placeholders = ', '.join('?' for _ in FORECAST_COLUMNS)
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO forecast ({', '.join(FORECAST_COLUMNS)}) VALUES ({placeholders})",
+            [tuple(forecast.get(column) for column in FORECAST_COLUMNS) for forecast in forecasts]
+        )
+
+
+def load_forecasts(conn, start_date, days):
+    """Stored forecasts for `days` days from `start_date` on, oldest first"""
+    rows = conn.execute(
+        f"SELECT {', '.join(FORECAST_COLUMNS)} FROM forecast WHERE date >= ? ORDER BY date LIMIT ?",
+        (start_date, days)
+    ).fetchall()
+    return [dict(zip(FORECAST_COLUMNS, row)) for row in rows]
+
+
+class ForecastScheduler:
+    """Background thread that keeps the stored forecast fresh.
+
+    `refresh` is called every `interval_seconds`, right after the local date
+    changes, and whenever `trigger()` is called (e.g. when ingest starts a new
+    day). Runs are serialized on the scheduler thread, so a burst of triggers
+    causes at most one extra refresh.
+    """
+
+    def __init__(self, refresh, interval_seconds=3600):
+        self.refresh = refresh
+        self.interval_seconds = interval_seconds
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Statistics
+        self._runs = 0
+        self._errors = 0
+        self._last_run = None
+        self._last_duration_ms = 0.0
+
+    def start(self):
+        """Start the scheduler thread (no-op if it is already running)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='forecast-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopping = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def trigger(self):
+        """Ask for a refresh as soon as possible"""
+        self._wake.set()
+
+    def _seconds_until_midnight(self):
+        now = datetime.now()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (midnight - now).total_seconds()
+
+    def _run(self):
+        while True:
+            # Wake at the next interval, the next midnight or on trigger()
+            self._wake.wait(min(self.interval_seconds, self._seconds_until_midnight() + 1))
+            self._wake.clear()
+            if self._stopping:
+                return
+
+            started = time.monotonic()
+            try:
+                self.refresh()
+            except Exception as e:
+                self._errors += 1
+                print(f"⚠️ Scheduled forecast failed: {e}")
+            self._runs += 1
+            self._last_run = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._last_duration_ms = (time.monotonic() - started) * 1000
+
+    def get_stats(self):
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'interval_seconds': self.interval_seconds,
+            'runs': self._runs,
+            'errors': self._errors,
+            'last_run': self._last_run,
+            'last_duration_ms': round(self._last_duration_ms, 2)
+        }
@@ -0,0 +1,95 @@
+"""
+In-memory hot state for the Weather Dashboard
+Holds the latest reading per station, the active alerts, the alert thresholds
+and the cached forecast so page loads and /api/latest_data need no database
+round trip. Updated by the ingest writer after every commit.
+"""
+
+import copy
+import threading
+
+DEFAULT_STATION = 'default'
+
+
+class HotState:
+    """Thread-safe container for the dashboard's frequently read state"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._warmed = False
+        self._latest = None
+        self._latest_by_station = {}
+        self._alerts = []
+        self._alert_titles = None
+        self._thresholds = None
+        self._forecast = None
+
+    @property
+    def warmed(self):
+        return self._warmed
+
+    def mark_warmed(self):
+        with self._lock:
+            self._warmed = True
+
+    def record_readings(self, records):
+        """Apply committed readings; returns the overall latest reading.
+
+        Readings arriving out of order (e.g. a gateway backfill) never replace
+        a newer reading.
+        """
+        with self._lock:
+            for record in records:
+                station = record.get('station_id') or DEFAULT_STATION
+                reading = {
+                    'station_id': station,
+                    'timestamp': record['timestamp'],
+                    'temperature': record['temperature'],
+                    'humidity': record['humidity'],
+                    'pressure': record.get('pressure')
+                }
+                current = self._latest_by_station.get(station)
+                if current is None or reading['timestamp'] >= current['timestamp']:
+                    self._latest_by_station[station] = reading
+                if self._latest is None or reading['timestamp'] >= self._latest['timestamp']:
+                    self._latest = reading
+            return dict(self._latest) if self._latest else None
+
+    def set_alerts(self, alerts):
+        """Store the current alerts; returns True if the set of active alerts changed"""
+        titles = [alert['title'] for alert in alerts]
+        with self._lock:
+            self._alerts = alerts
+            changed = titles != self._alert_titles
+            self._alert_titles = titles
+            return changed
+
+    def set_thresholds(self, thresholds):
+        with self._lock:
+            self._thresholds = dict(thresholds)
+
+    def get_thresholds(self):
+        with self._lock:
+            return dict(self._thresholds) if self._thresholds is not None else None
+
+    def set_forecast(self, forecast):
+        with self._lock:
+            self._forecast = forecast
+
+    def get_forecast(self):
+        with self._lock:
+            return copy.deepcopy(self._forecast)
+
+    def get_latest(self):
+        with self._lock:
+            return dict(self._latest) if self._latest else None
+
+    def snapshot(self):
+        """Consistent copy of everything for one request"""
+        with self._lock:
+            return {
+                'latest': dict(self._latest) if self._latest else None,
+                'stations': {station: dict(reading) for station, reading in self._latest_by_station.items()},
+                'alerts': copy.deepcopy(self._alerts),
+                'forecast': copy.deepcopy(self._forecast)
+            }
@@ -0,0 +1,268 @@
+"""
+Write-behind ingest queue for the Weather Dashboard
+Buffers incoming sensor readings in memory and writes them to the database
+from a background thread in group commits. A group whose commit keeps
+failing is retried with backoff; readings that were already acknowledged
+are then appended to a dead-letter file instead of being dropped.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Durability modes
+ACK_AFTER_ENQUEUE = 'enqueue'   # Return as soon as the reading is queued
+ACK_AFTER_COMMIT = 'commit'     # Return once the reading's group commit finished
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingest queue cannot accept more readings"""
+
+
+class _Ticket:
+    """One submission to the queue (a single reading or a whole batch)"""
+
+    __slots__ = ('rows', 'enqueued_at', 'done', 'records', 'error')
+
+    def __init__(self, rows, wait_for_commit):
+        self.rows = rows
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event() if wait_for_commit else None
+        self.records = None
+        self.error = None
+
+
+class IngestQueue:
+    """Bounded in-memory queue drained by a single writer thread.
+
+    Readings are coalesced into group commits: the writer flushes once
+    `flush_rows` readings are pending or the oldest pending reading has waited
+    `flush_interval_ms`, whichever comes first. `write_batch` is called with the
+    list of (timestamp, temperature, humidity, pressure) rows of one group and
+    must commit them in a single transaction, returning the stored records.
+
+    A failed group commit is retried `max_retries` times, waiting
+    `retry_backoff_ms` and doubling the wait after each attempt. If it still
+    fails, submitters waiting in ACK_AFTER_COMMIT mode get the error, and
+    readings acknowledged in ACK_AFTER_ENQUEUE mode are appended as JSON
+    lines to `dead_letter_path` (if set) so they can be re-ingested.
+    """
+
+    def __init__(self, write_batch, max_queue_size=10000, flush_rows=200,
+                 flush_interval_ms=250, durability=ACK_AFTER_ENQUEUE,
+                 max_group_rows=5000, max_retries=3, retry_backoff_ms=100,
+                 dead_letter_path=None):
+        if durability not in (ACK_AFTER_ENQUEUE, ACK_AFTER_COMMIT):
+            raise ValueError(f"Unknown durability mode: {durability}")
+
+        self.write_batch = write_batch
+        self.max_queue_size = max_queue_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.durability = durability
+        self.max_group_rows = max_group_rows
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000.0
+        self.dead_letter_path = dead_letter_path
+
+        self._pending = deque()
+        self._pending_rows = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+        # Statistics
+        self._flushes = 0
+        self._rows_written = 0
+        self._write_errors = 0
+        self._retries = 0
+        self._dead_lettered = 0
+        self._lost = 0
+        self._rejected_full = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._max_queue_depth = 0
+
+    def start(self):
+        """Start the writer thread (no-op if it is already running)"""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._writer, name='ingest-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=10):
+        """Flush everything still queued and stop the writer thread"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def submit(self, rows, timeout=1.0):
+        """Queue readings for writing.
+
+        In ACK_AFTER_COMMIT mode this blocks until the readings are committed
+        and returns the stored records; in ACK_AFTER_ENQUEUE mode it returns
+        None immediately after queueing. Raises IngestQueueFull if the queue
+        stays full for `timeout` seconds.
+        """
+        if not rows:
+            return []
+
+        self.start()
+        ticket = _Ticket(list(rows), self.durability == ACK_AFTER_COMMIT)
+
+        with self._condition:
+            deadline = time.monotonic() + timeout
+            while self._pending_rows + len(ticket.rows) > self.max_queue_size and self._pending_rows > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._rejected_full += len(ticket.rows)
+                    raise IngestQueueFull(f"Ingest queue full ({self._pending_rows} readings pending)")
+                self._condition.wait(remaining)
+
+            ticket.enqueued_at = time.monotonic()
+            self._pending.append(ticket)
+            self._pending_rows += len(ticket.rows)
+            self._max_queue_depth = max(self._max_queue_depth, self._pending_rows)
+            # Wake the writer: it starts the flush timer or flushes a full group
+            self._condition.notify_all()
+
+        if ticket.done is None:
+            return None
+
+        ticket.done.wait()
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.records
+
+    def _next_group(self):
+        """Wait for a flush trigger and take the next group of tickets"""
+        with self._condition:
+            while True:
+                if self._pending:
+                    age = time.monotonic() - self._pending[0].enqueued_at
+                    if self._stopping or self._pending_rows >= self.flush_rows or age >= self.flush_interval:
+                        break
+                    self._condition.wait(self.flush_interval - age)
+                elif self._stopping:
+                    return None
+                else:
+                    self._condition.wait()
+
+            group = []
+            group_rows = 0
+            while self._pending and (not group or group_rows + len(self._pending[0].rows) <= self.max_group_rows):
+                ticket = self._pending.popleft()
+                group.append(ticket)
+                group_rows += len(ticket.rows)
+            self._pending_rows -= group_rows
+            # Wake submitters waiting for space
+            self._condition.notify_all()
+            return group
+
+    def _write_with_retry(self, rows):
+        """Commit one group, retrying with exponential backoff; returns (records, error)"""
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.write_batch(rows), None
+            except Exception as e:
+                error = e
+            if attempt < self.max_retries:
+                logger.warning(f"Writing ingest group of {len(rows)} readings failed, "
+                               f"retrying in {delay:.2f}s: {error}")
+                with self._condition:
+                    self._retries += 1
+                time.sleep(delay)
+                delay *= 2
+        logger.error(f"Error writing ingest group of {len(rows)} readings: {error}")
+        return None, error
+
+    def _dead_letter(self, rows, error):
+        """Keep acknowledged readings whose commit failed; returns True if they were saved"""
+        if self.dead_letter_path:
+            try:
+                with open(self.dead_letter_path, 'a') as f:
+                    for row in rows:
+                        f.write(json.dumps({'row': list(row), 'error': str(error)}) + '\n')
+                logger.error(f"Wrote {len(rows)} acknowledged readings to {self.dead_letter_path}")
+                return True
+            except OSError as e:
+                logger.error(f"Could not write dead letters to {self.dead_letter_path}: {e}")
+        logger.error(f"Lost {len(rows)} acknowledged readings: {error}")
+        return False
+
+    def _writer(self):
+        """Writer thread: drain the queue in group commits"""
+        while True:
+            group = self._next_group()
+            if group is None:
+                return
+
+            rows = [row for ticket in group for row in ticket.rows]
+            started = time.perf_counter()
+            records, error = self._write_with_retry(rows)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            # Nobody is waiting for acknowledged readings, so they must not vanish
+            if error is not None:
+                acked = [row for ticket in group if ticket.done is None for row in ticket.rows]
+                if acked:
+                    saved = self._dead_letter(acked, error)
+                    with self._condition:
+                        if saved:
+                            self._dead_lettered += len(acked)
+                        else:
+                            self._lost += len(acked)
+
+            with self._condition:
+                self._flushes += 1
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+                if error is None:
+                    self._rows_written += len(rows)
+                else:
+                    self._write_errors += len(rows)
+
+            # Hand each ticket its slice of the stored records
+            offset = 0
+            for ticket in group:
+                if records is not None:
+                    ticket.records = records[offset:offset + len(ticket.rows)]
+                ticket.error = error
+                offset += len(ticket.rows)
+                if ticket.done is not None:
+                    ticket.done.set()
+
+    def get_stats(self):
+        """Queue depth and flush latency statistics"""
+        with self._condition:
+            return {
+                'durability': self.durability,
+                'running': bool(self._thread and self._thread.is_alive()),
+                'queue_depth': self._pending_rows,
+                'max_queue_depth': self._max_queue_depth,
+                'max_queue_size': self.max_queue_size,
+                'flush_rows': self.flush_rows,
+                'flush_interval_ms': self.flush_interval * 1000,
+                'flushes': self._flushes,
+                'rows_written': self._rows_written,
+                'write_errors': self._write_errors,
+                'retries': self._retries,
+                'dead_lettered': self._dead_lettered,
+                'lost': self._lost,
+                'dead_letter_path': self.dead_letter_path,
+                'rejected_queue_full': self._rejected_full,
+                'last_flush_ms': round(self._last_flush_ms, 3),
+                'max_flush_ms': round(self._max_flush_ms, 3),
+                'avg_flush_ms': round(self._total_flush_ms / self._flushes, 3) if self._flushes else 0.0
+            }
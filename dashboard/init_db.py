@@ -1,8 +1,25 @@
 # init_db.py
 import sqlite3
+import sys
+from datetime import datetime
 
-def init_db():
-    conn = sqlite3.connect('weather.db')
+from database import to_epoch
+from rollups import create_rollup_tables, rebuild_rollups
+from forecast_scheduler import create_forecast_table
+from online_forecaster import create_state_table
+from shadow_inference import create_shadow_table
+from backup_outbox import create_outbox_table, create_state_table as create_backup_state_table
+
+# Rows converted per transaction when backfilling existing data
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def _column_names(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _create_sensor_data(conn):
+    """Migration 1: original sensor_data table"""
     conn.execute('''
         CREATE TABLE IF NOT EXISTS sensor_data (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -12,9 +29,159 @@ def init_db():
             pressure FLOAT
         )
     ''')
-    conn.commit()
+
+
+def _add_epoch_timestamps(conn):
+    """Migration 2: integer epoch-seconds `ts` column with a covering index.
+
+    The text `timestamp` column is kept for display and Firebase document ids;
+    all range and latest-reading queries use `ts`.
+    """
+    if 'ts' not in _column_names(conn, 'sensor_data'):
+        conn.execute('ALTER TABLE sensor_data ADD COLUMN ts INTEGER')
+
+    # Backfill in id-ordered chunks so a large table never sits in one transaction
+    last_id = 0
+    converted = 0
+    unparsed = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, timestamp FROM sensor_data
+            WHERE id > ? AND ts IS NULL
+            ORDER BY id
+            LIMIT ?
+        ''', (last_id, BACKFILL_CHUNK_SIZE)).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for row_id, timestamp in rows:
+            ts = to_epoch(timestamp)
+            if ts is None:
+                unparsed += 1
+            else:
+                updates.append((ts, row_id))
+
+        with conn:
+            conn.executemany('UPDATE sensor_data SET ts = ? WHERE id = ?', updates)
+
+        converted += len(updates)
+        last_id = rows[-1][0]
+        print(f"  Backfilled epoch timestamps for {converted} rows...")
+
+    if unparsed:
+        print(f"  ⚠️ {unparsed} rows have unparseable timestamps and were left without ts")
+
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sensor_data_ts
+        ON sensor_data (ts, temperature, humidity)
+    ''')
+
+
+def _add_rollups(conn):
+    """Migration 3: hourly and daily rollup tables, built from existing data"""
+    create_rollup_tables(conn)
+    rebuild_rollups(conn)
+
+
+def _add_station_id(conn):
+    """Migration 4: station id per reading (existing rows belong to 'default')"""
+    if 'station_id' not in _column_names(conn, 'sensor_data'):
+        conn.execute("ALTER TABLE sensor_data ADD COLUMN station_id TEXT NOT NULL DEFAULT 'default'")
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sensor_data_station_ts
+        ON sensor_data (station_id, ts)
+    ''')
+
+
+def _add_forecast_table(conn):
+    """Migration 5: precomputed forecasts written by the forecast scheduler"""
+    create_forecast_table(conn)
+
+
+def _add_forecaster_state(conn):
+    """Migration 6: persisted state of the online statistical forecaster"""
+    create_state_table(conn)
+
+
+def _add_shadow_predictions(conn):
+    """Migration 7: outputs and latencies of active and shadow models"""
+    create_shadow_table(conn)
+
+
+def _add_backup_outbox(conn):
+    """Migration 8: durable outbox of readings waiting for Firebase replication"""
+    create_outbox_table(conn)
+
+
+def _add_backup_state(conn):
+    """Migration 9: persisted backup progress (high-water mark)"""
+    create_backup_state_table(conn)
+
+
+def _key_rollups_by_station(conn):
+    """Migration 10: rollups per station instead of mixing all stations per bucket"""
+    with conn:
+        for table in ('hourly_rollup', 'daily_rollup'):
+            conn.execute(f'DROP TABLE IF EXISTS {table}')
+        # Built from the mixed rollups; rebuilt from the station's rollups on startup
+        conn.execute('DELETE FROM forecaster_state')
+    rebuild_rollups(conn)
+
+
+def _link_shadow_predictions(conn):
+    """Migration 11: link shadow rows to the active row they were compared with"""
+    if 'active_id' not in _column_names(conn, 'shadow_predictions'):
+        conn.execute('ALTER TABLE shadow_predictions ADD COLUMN active_id INTEGER')
+
+
+# Ordered list of (version, description, migration function)
+MIGRATIONS = [
+    (1, 'create sensor_data table', _create_sensor_data),
+    (2, 'integer epoch timestamps with covering index', _add_epoch_timestamps),
+    (3, 'hourly and daily rollup tables', _add_rollups),
+    (4, 'station id per reading', _add_station_id),
+    (5, 'forecast table', _add_forecast_table),
+    (6, 'online forecaster state', _add_forecaster_state),
+    (7, 'shadow model predictions', _add_shadow_predictions),
+    (8, 'firebase replication outbox', _add_backup_outbox),
+    (9, 'firebase backup high-water mark', _add_backup_state),
+    (10, 'rollups keyed by station', _key_rollups_by_station),
+    (11, 'shadow rows linked to active predictions', _link_shadow_predictions),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Schema version recorded in the database (PRAGMA user_version)"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn):
+    """Apply all pending migrations in order. Returns the final schema version."""
+    version = get_schema_version(conn)
+
+    for target, description, migration in MIGRATIONS:
+        if target <= version:
+            continue
+
+        print(f"Applying migration {target}: {description}")
+        started = datetime.now()
+        migration(conn)
+        with conn:
+            conn.execute(f'PRAGMA user_version = {int(target)}')
+        version = target
+        print(f"Migration {target} done in {(datetime.now() - started).total_seconds():.1f}s")
+
+    return version
+
+
+def init_db(db_path='weather.db'):
+    conn = sqlite3.connect(db_path)
+    version = migrate(conn)
     conn.close()
-    print("Database initialized successfully!")
+    print(f"Database initialized successfully! (schema version {version})")
 
 if __name__ == '__main__':
-    init_db()
\ No newline at end of file
+    init_db(sys.argv[1] if len(sys.argv) > 1 else 'weather.db')
\ No newline at end of file
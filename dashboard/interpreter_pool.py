@@ -0,0 +1,120 @@
+"""
+Interpreter pool for TensorFlow Lite inference
+A TFLite interpreter must not be invoked from two threads at once, so every
+Flask request thread checks out its own interpreter (with its own allocated
+tensors) from a bounded pool and returns it when done.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+
+class InterpreterPoolTimeout(Exception):
+    """Raised when no interpreter becomes free within the checkout timeout"""
+
+
+class PooledInterpreter:
+    """One interpreter plus its cached input/output tensor accessors"""
+
+    __slots__ = ('interpreter', 'input_index', 'output_index', 'input_shape',
+                 'batch_size', 'input_tensor', 'output_tensor')
+
+    def __init__(self, interpreter):
+        interpreter.allocate_tensors()
+        self.interpreter = interpreter
+        input_details = interpreter.get_input_details()[0]
+        self.input_index = input_details['index']
+        self.output_index = interpreter.get_output_details()[0]['index']
+        self.input_shape = tuple(input_details['shape'])
+        self.batch_size = self.input_shape[0]
+        # tensor() returns an accessor that fetches the current buffer on each
+        # call, so it stays valid across resizes
+        self.input_tensor = interpreter.tensor(self.input_index)
+        self.output_tensor = interpreter.tensor(self.output_index)
+
+    def resize(self, batch_size):
+        """Resize the input to `batch_size` windows (no-op if already that size)"""
+        if batch_size == self.batch_size:
+            return
+        self.interpreter.resize_tensor_input(self.input_index, [batch_size, *self.input_shape[1:]])
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+
+
+class InterpreterPool:
+    """Fixed-size pool of interpreters with checkout/return semantics.
+
+    `factory` creates a new (unallocated) interpreter; all `size` interpreters
+    are created up front so a broken model fails at load time.
+    """
+
+    def __init__(self, factory, size=2):
+        if size < 1:
+            raise ValueError("Interpreter pool size must be at least 1")
+
+        self.size = size
+        self._idle = LifoQueue(maxsize=size)
+        self._slots = [PooledInterpreter(factory()) for _ in range(size)]
+        for slot in self._slots:
+            self._idle.put(slot)
+
+        # Statistics
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+
+    @property
+    def interpreters(self):
+        """All pooled interpreters (for warm-up before the pool is shared)"""
+        return list(self._slots)
+
+    @property
+    def primary(self):
+        """First interpreter, for inspecting model details"""
+        return self._slots[0].interpreter
+
+    @contextmanager
+    def checkout(self, timeout=5.0):
+        """Borrow an interpreter for the duration of the with-block"""
+        started = time.monotonic()
+        try:
+            slot = self._idle.get_nowait()
+            waited = False
+        except Empty:
+            waited = True
+            try:
+                slot = self._idle.get(timeout=timeout)
+            except Empty:
+                with self._lock:
+                    self._timeouts += 1
+                raise InterpreterPoolTimeout(f"No interpreter free after {timeout}s")
+
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._checkouts += 1
+            self._total_wait_ms += wait_ms
+            self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+            if waited:
+                self._waits += 1
+
+        try:
+            yield slot
+        finally:
+            self._idle.put(slot)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': self._idle.qsize(),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': round(self._total_wait_ms / self._checkouts, 3) if self._checkouts else 0.0,
+                'max_wait_ms': round(self._max_wait_ms, 3)
+            }
@@ -6,11 +6,20 @@ or heavy ML dependencies. Uses statistical methods and TensorFlow Lite.
 """
 
 import os
-import sqlite3
+import copy
+import hashlib
 import numpy as np
 import json
+import random
+import threading
+import time
 from datetime import datetime, timedelta
-import math
+
+from database import get_connection, to_epoch
+from hot_state import DEFAULT_STATION
+from interpreter_pool import InterpreterPool
+from model_registry import ModelRegistry, REGISTRY_PATH
+from preprocessing import Preprocessor
 
 # Try to load TensorFlow Lite (much lighter than full TensorFlow)
 try:
@@ -26,153 +35,576 @@ except ImportError:
         print("⚠️ TensorFlow Lite not available, using statistical predictions")
         TFLITE_AVAILABLE = False
 
+# Seconds a cached forecast stays valid when no new daily data arrives
+FORECAST_CACHE_TTL = 900
+
+# Candidate (model, config) locations when there is no model registry, in order of preference
+MODEL_FILES = [
+    ('models/weather_prediction_model.tflite', 'models/model_config.json'),
+    ('weather_prediction_model.tflite', 'model_config.json'),
+    (os.path.join('edge-deployment', 'model.tflite'), os.path.join('edge-deployment', 'config.json'))
+]
+
+# Plausible range for predicted temperatures when validating a newly loaded model
+CANARY_TEMPERATURE_RANGE = (-60.0, 70.0)
+
+# Fraction of forecasts served from the cache whose input window is scored by
+# the shadow models again (latency samples only; see ShadowRunner)
+SHADOW_SAMPLE_RATE = 0.1
+
+def _read_optional(path):
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return None
+
+def model_digest(model_path, config_path):
+    """SHA-256 over the model file and its config (if present)"""
+    return _digest(_read_optional(model_path) or b'', _read_optional(config_path))
+
+def _digest(model_bytes, config_bytes):
+    digest = hashlib.sha256(model_bytes)
+    digest.update(config_bytes or b'')
+    return digest.hexdigest()
+
+class LoadedModel:
+    """A TFLite model with its interpreter pool and scaler, swapped in as one unit"""
+    
+    def __init__(self, model_path, config_path, pool, config, digest, name=None):
+        self.model_path = model_path
+        self.config_path = config_path
+        self.pool = pool
+        self.config = config
+        self.digest = digest
+        self.preprocessor = Preprocessor.from_config(config)
+        # Registry version id if known, else the file path
+        self.model_id = f"{name or model_path}@{digest[:12]}"
+        self.loaded_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    def predict_batch(self, windows):
+        """Run the model on N windows of shape (30, 6) in a single invoke().
+        
+        Returns an (N, 4) array of denormalized [prcp, tavg, tmax, tmin].
+        """
+        windows = np.asarray(windows)
+        if windows.ndim != 3 or windows.shape[1:] != (30, 6):
+            raise ValueError(f"Expected windows of shape (N, 30, 6), got {windows.shape}")
+        
+        with self.pool.checkout() as slot:
+            slot.resize(len(windows))
+            
+            # Normalize straight into the interpreter's input buffer; the view must
+            # be released before invoke(), so it is never kept around
+            input_view = slot.input_tensor()
+            self.preprocessor.transform(windows, out=input_view)
+            del input_view
+            
+            slot.interpreter.invoke()
+            return self.preprocessor.inverse_transform(slot.output_tensor())
+
 class LightweightPredictor:
     """Lightweight weather predictor using statistical methods and optional TensorFlow Lite"""
     
-    def __init__(self, dashboard_db_path='weather.db'):
+    def __init__(self, dashboard_db_path='weather.db', forecast_ttl=FORECAST_CACHE_TTL,
+                 online_forecaster=None, pool_size=2, num_threads=None,
+                 registry_path=REGISTRY_PATH, shadow_runner=None, mae_budget=None,
+                 shadow_sample_rate=SHADOW_SAMPLE_RATE, station_id=DEFAULT_STATION):
         self.db_path = dashboard_db_path
-        self.interpreter = None
-        self.model_config = None
+        # Station whose daily rollups feed the forecast
+        self.station_id = station_id
+        # Constant-time statistical forecasts, kept up to date by ingest (optional)
+        self.online_forecaster = online_forecaster
+        
+        # Model versions (see model_registry.py); shadow models are only loaded
+        # when there is a shadow runner to score them
+        self.registry_path = registry_path
+        self.registry = None
+        self.shadow_runner = shadow_runner
+        # The active model only runs on forecast cache misses (about once per
+        # data version), so cache hits replay its last window to the shadows
+        # as well: (model id, data version, window, output, latency ms)
+        self.shadow_sample_rate = shadow_sample_rate
+        self._shadow_input = None
+        # Allowed temperature MAE increase (°C) when picking a faster variant of
+        # the active version; None always serves the active version itself
+        self.mae_budget = mae_budget
+        
+        # Active model; replaced as a whole on reload so in-flight predictions
+        # finish on the model they started with
+        self._model = None
+        self._reload_lock = threading.Lock()
+        self._default_preprocessor = Preprocessor.from_config(None)
+        
+        # One interpreter per concurrent prediction; num_threads is per interpreter
+        self.pool_size = pool_size
+        self.num_threads = num_threads
+        
+        # Forecast cache: (model id, daily data version, prediction date, horizon days) -> (expires at, prediction)
+        self.forecast_ttl = forecast_ttl
+        self._forecast_cache = {}
+        self._cache_lock = threading.Lock()
+        self._data_version = None
+        self._cache_hits = 0
+        self._cache_misses = 0
         
         # Try to load TensorFlow Lite model
         self._load_tflite_model()
+        self.load_shadow_models()
+    
+    @property
+    def interpreter_pool(self):
+        model = self._model
+        return model.pool if model else None
+    
+    @property
+    def interpreter(self):
+        model = self._model
+        return model.pool.primary if model else None
+    
+    @property
+    def model_config(self):
+        model = self._model
+        return model.config if model else None
+    
+    @property
+    def preprocessor(self):
+        """Same scaler parameters the model was trained with (see preprocessing.py)"""
+        model = self._model
+        return model.preprocessor if model else self._default_preprocessor
+    
+    @property
+    def model_id(self):
+        model = self._model
+        return model.model_id if model else 'statistical'
+    
+    @property
+    def model_digest(self):
+        model = self._model
+        return model.digest if model else None
+    
+    def _model_candidates(self):
+        """Existing (model path, config path, version id) candidates, in order of preference.
         
-    def _load_tflite_model(self):
-        """Load TensorFlow Lite model if available"""
-        model_paths = [
-            'models/weather_prediction_model.tflite',
-            'weather_prediction_model.tflite',
-            os.path.join('edge-deployment', 'model.tflite')
-        ]
+        The registry's active version when there is a registry (preceded by
+        its fastest variant within `mae_budget`), else the known model
+        locations. The registry file is re-read on every call.
+        """
+        try:
+            self.registry = ModelRegistry.load(self.registry_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Invalid model registry {self.registry_path}: {e}")
+            self.registry = None
         
-        config_paths = [
-            'models/model_config.json',
-            'model_config.json', 
-            os.path.join('edge-deployment', 'config.json')
-        ]
+        if self.registry is not None:
+            active = self.registry.active
+            if active is None:
+                return
+            versions = [active]
+            if self.mae_budget is not None:
+                versions.insert(0, self.registry.choose_variant(active, self.mae_budget))
+            for version in dict.fromkeys(versions):
+                if version.available:
+                    yield version.model_path, version.config_path, version.id
+            return
+        
+        for model_path, config_path in MODEL_FILES:
+            if os.path.exists(model_path):
+                yield model_path, config_path, None
+    
+    def find_model_files(self):
+        """(model path, config path) of the model that should be active, or None"""
+        for model_path, config_path, _ in self._model_candidates():
+            return model_path, config_path
+        return None
+    
+    def _build_model(self, model_path, config_path, name=None, pool_size=None):
+        """Load a model into a new interpreter pool without touching the active one"""
+        model_bytes = _read_optional(model_path)
+        config_bytes = _read_optional(config_path)
+        if model_bytes is None:
+            raise FileNotFoundError(model_path)
         
+        pool = InterpreterPool(
+            lambda: tflite.Interpreter(model_content=model_bytes, num_threads=self.num_threads),
+            size=pool_size or self.pool_size
+        )
+        config = json.loads(config_bytes) if config_bytes else None
+        return LoadedModel(model_path, config_path, pool, config, _digest(model_bytes, config_bytes), name)
+    
+    def _validate_model(self, model):
+        """Warm every interpreter of a new model on a canary window and sanity-check the output"""
+        canary = self.get_dashboard_data(30)
+        if canary is None or len(canary) < 30:
+            # Mid-range input in the model's own scaling
+            canary = model.preprocessor.inverse_transform(np.full((30, 6), 0.5, dtype=np.float32))
+        window = np.asarray(canary[-30:], dtype=np.float32)[np.newaxis]
+        
+        low, high = CANARY_TEMPERATURE_RANGE
+        for slot in model.pool.interpreters:
+            slot.resize(1)
+            input_view = slot.input_tensor()
+            model.preprocessor.transform(window, out=input_view)
+            del input_view
+            slot.interpreter.invoke()
+            output = model.preprocessor.inverse_transform(slot.output_tensor())
+            
+            if output.shape != (1, 4):
+                raise ValueError(f"Canary prediction has shape {output.shape}, expected (1, 4)")
+            if not np.all(np.isfinite(output)):
+                raise ValueError("Canary prediction is not finite")
+            if np.any(output[0, 1:] < low) or np.any(output[0, 1:] > high):
+                raise ValueError(f"Canary temperatures out of range: {output[0, 1:].round(1).tolist()}")
+    
+    def _version_name(self, model_path):
+        """Registry version id of a model file, if it is registered"""
+        if self.registry is not None:
+            for version in self.registry.versions.values():
+                if os.path.abspath(version.model_path) == os.path.abspath(model_path):
+                    return version.id
+        return None
+    
+    def reload_model(self, model_path=None, config_path=None):
+        """Load, warm and validate a model in the background, then swap it in atomically.
+        
+        Returns True if the new model is now active. On any failure the current
+        model keeps serving.
+        """
+        if not TFLITE_AVAILABLE:
+            return False
+        if model_path is None:
+            files = self.find_model_files()
+            if files is None:
+                return False
+            model_path, config_path = files
+        
+        with self._reload_lock:
+            try:
+                model = self._build_model(model_path, config_path, self._version_name(model_path))
+                self._validate_model(model)
+            except Exception as e:
+                print(f"⚠️ Model reload from {model_path} rejected: {e}")
+                return False
+            
+            previous = self._model
+            # Single reference assignment: requests see either the old or the new model
+            self._model = model
+            self.invalidate_forecast_cache()
+        
+        if previous is None or previous.digest != model.digest:
+            print(f"🧠 TensorFlow Lite model loaded: {model_path} ({self.pool_size} interpreters, {model.model_id})")
+        return True
+    
+    def _load_tflite_model(self):
+        """Load TensorFlow Lite model if available"""
         if not TFLITE_AVAILABLE:
             print("📊 Using statistical prediction methods (TensorFlow Lite not available)")
             return
             
-        for model_path, config_path in zip(model_paths, config_paths):
-            if os.path.exists(model_path):
-                try:
-                    self.interpreter = tflite.Interpreter(model_path=model_path)
-                    self.interpreter.allocate_tensors()
-                    
-                    if os.path.exists(config_path):
-                        with open(config_path, 'r') as f:
-                            self.model_config = json.load(f)
-                    
-                    print(f"🧠 TensorFlow Lite model loaded: {model_path}")
-                    return
-                except Exception as e:
-                    print(f"⚠️ Failed to load {model_path}: {e}")
+        for model_path, config_path, _ in self._model_candidates():
+            if self.reload_model(model_path, config_path):
+                return
                     
         print("📊 Using statistical prediction methods (no TensorFlow Lite model found)")
     
-    def _normalize_data(self, data, feature_name):
-        """Simple min-max normalization"""
-        if not self.model_config or 'feature_ranges' not in self.model_config:
-            # Default ranges based on typical weather data
-            ranges = {
-                'temperature': {'min': -20, 'max': 50},
-                'humidity': {'min': 0, 'max': 100},
-                'precipitation': {'min': 0, 'max': 100}
-            }
-        else:
-            ranges = self.model_config['feature_ranges']
-            
-        if feature_name in ranges:
-            min_val = ranges[feature_name]['min']
-            max_val = ranges[feature_name]['max']
-            return (data - min_val) / (max_val - min_val)
-        return data
-    
-    def _denormalize_data(self, data, feature_name):
-        """Reverse normalization"""
-        if not self.model_config or 'feature_ranges' not in self.model_config:
-            ranges = {
-                'temperature': {'min': -20, 'max': 50},
-                'humidity': {'min': 0, 'max': 100}
-            }
-        else:
-            ranges = self.model_config['feature_ranges']
-            
-        if feature_name in ranges:
-            min_val = ranges[feature_name]['min']
-            max_val = ranges[feature_name]['max']
-            return data * (max_val - min_val) + min_val
-        return data
+    def load_shadow_models(self):
+        """(Re)load the registry's shadow versions into the shadow runner.
         
-    def get_dashboard_data(self, days=30):
-        """Get the last N days of data from dashboard database"""
+        Each shadow model gets a single interpreter, since only the shadow
+        thread uses it. Versions that fail to load or validate are skipped.
+        """
+        if self.shadow_runner is None or not TFLITE_AVAILABLE:
+            return []
+        
+        models = []
+        for version in (self.registry.shadows if self.registry else []):
+            try:
+                model = self._build_model(version.model_path, version.config_path, version.id, pool_size=1)
+                self._validate_model(model)
+                models.append(model)
+                print(f"👥 Shadow model loaded: {model.model_id}")
+            except Exception as e:
+                print(f"⚠️ Shadow model {version.id} not loaded: {e}")
+        
+        self.shadow_runner.set_models(models)
+        return models
+    
+    def _run_model(self, window):
+        """Run the model on one (30, 6) window; returns denormalized [prcp, tavg, tmax, tmin]"""
+        return self.predict_batch(np.asarray(window)[np.newaxis])[0]
+    
+    def predict_batch(self, windows):
+        """Run the active model on N windows of shape (30, 6) in a single invoke().
+        
+        Returns an (N, 4) array of denormalized [prcp, tavg, tmax, tmin].
+        """
+        model = self._model
+        if model is None:
+            raise RuntimeError("TensorFlow Lite model not loaded")
+        return model.predict_batch(windows)
+    
+    def get_daily_history(self, days=None):
+        """Daily feature rows from the daily rollup table, oldest first.
+        
+        Returns (buckets, features): the epoch of each local day and an (n, 6)
+        array of [prcp, tavg, tmax, tmin, day_sin, day_cos]. days=None reads
+        the whole history.
+        """
+        conn = get_connection(self.db_path)
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            
-            # Get last 30 days of data
-            query = '''
-                SELECT temperature, humidity, timestamp 
-                FROM sensor_data 
-                ORDER BY timestamp DESC 
+            # Last N precomputed daily aggregates (newest first); LIMIT -1 means no limit
+            rows = conn.execute('''
+                SELECT bucket, count, temperature_sum, temperature_min, temperature_max
+                FROM daily_rollup 
+                WHERE station_id = ?
+                ORDER BY bucket DESC 
                 LIMIT ?
-            '''
-            
-            rows = conn.execute(query, (days * 24,)).fetchall()  # Assume hourly data
+            ''', (self.station_id, days if days is not None else -1)).fetchall()
+        finally:
             conn.close()
+        
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty((0, 6))
+        
+        # Chronological order
+        daily = np.array([tuple(row) for row in reversed(rows)], dtype=np.float64)
+        buckets = daily[:, 0].astype(np.int64)
+        
+        # Seasonal component from each day's day-of-year
+        day_of_year = np.array([datetime.fromtimestamp(bucket).timetuple().tm_yday
+                                for bucket in buckets])
+        angle = 2 * np.pi * day_of_year / 365
+        
+        features = np.column_stack([
+            np.zeros(len(daily)),           # prcp (not measured by the sensor nodes)
+            daily[:, 2] / daily[:, 1],      # tavg
+            daily[:, 4],                    # tmax
+            daily[:, 3],                    # tmin
+            np.sin(angle),                  # day_of_year_sin
+            np.cos(angle)                   # day_of_year_cos
+        ])
+        
+        return buckets, features
+    
+    def get_dashboard_data(self, days=30):
+        """Get the last N days of data from the daily rollup table"""
+        try:
+            _, weather_sequence = self.get_daily_history(days)
             
-            if len(rows) < days:
-                print(f"⚠️ Only {len(rows)} data points available, need at least {days}")
+            if len(weather_sequence) == 0:
+                print("⚠️ No daily data available")
                 return None
-                
-            # Convert to daily averages (group by date)
-            daily_data = {}
-            for row in rows:
-                date = row['timestamp'][:10]  # Get date part (YYYY-MM-DD)
-                if date not in daily_data:
-                    daily_data[date] = {'temps': [], 'humidity': []}
-                
-                daily_data[date]['temps'].append(float(row['temperature']))
-                daily_data[date]['humidity'].append(float(row['humidity']))
             
-            # Convert to model input format
-            weather_sequence = []
-            dates = sorted(daily_data.keys(), reverse=True)[:days]
+            return weather_sequence
             
-            for date in reversed(dates):  # Reverse to get chronological order
-                day_data = daily_data[date]
-                avg_temp = np.mean(day_data['temps'])
-                max_temp = np.max(day_data['temps']) 
-                min_temp = np.min(day_data['temps'])
-                avg_humidity = np.mean(day_data['humidity'])
+        except Exception as e:
+            print(f"❌ Error getting dashboard data: {e}")
+            return None
+    
+    def notify_daily_data(self, day_bucket):
+        """Record that the daily rollup for `day_bucket` changed.
+
+        A newer day than any seen before bumps the data version, so the next
+        forecast request misses the cache and re-runs the model.
+        """
+        with self._cache_lock:
+            if self._data_version is None or day_bucket > self._data_version:
+                self._data_version = day_bucket
+                self._forecast_cache.clear()
+    
+    def invalidate_forecast_cache(self):
+        """Drop all cached forecasts"""
+        with self._cache_lock:
+            self._forecast_cache.clear()
+    
+    def _current_data_version(self):
+        """Newest daily rollup bucket, read from the database only until ingest reports one"""
+        with self._cache_lock:
+            if self._data_version is not None:
+                return self._data_version
+        try:
+            conn = get_connection(self.db_path)
+            row = conn.execute('SELECT MAX(bucket) FROM daily_rollup WHERE station_id = ?',
+                               (self.station_id,)).fetchone()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️ Could not read daily data version: {e}")
+            return None
+        if row and row[0] is not None:
+            self.notify_daily_data(row[0])
+        return row[0] if row else None
+    
+    def get_cache_stats(self):
+        with self._cache_lock:
+            return {
+                'entries': len(self._forecast_cache),
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'ttl_seconds': self.forecast_ttl,
+                'data_version': self._data_version,
+                'model_id': self.model_id
+            }
+    
+    def _cached_prediction(self, horizon_days, compute, use_cache=True):
+        """Serve a prediction from the forecast cache, computing and storing it on a miss"""
+        prediction_date = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        key = (self.model_id, self._current_data_version(), prediction_date, horizon_days)
+        
+        if use_cache:
+            with self._cache_lock:
+                entry = self._forecast_cache.get(key)
+                hit = entry is not None and entry[0] > time.monotonic()
+                if hit:
+                    self._cache_hits += 1
+                else:
+                    self._cache_misses += 1
+            if hit:
+                self._replay_shadows()
+                return copy.deepcopy(entry[1])
+        
+        prediction = compute()
+        
+        # The random fallbacks are not worth keeping
+        first = prediction[0] if isinstance(prediction, list) and prediction else prediction
+        if first and first.get('model_used') in ('TensorFlow_Lite', 'Online_Holt', 'Statistical_Trend'):
+            now = time.monotonic()
+            with self._cache_lock:
+                # Drop expired entries and ones for an older data version or date
+                self._forecast_cache = {k: v for k, v in self._forecast_cache.items()
+                                        if v[0] > now and k[1:3] == key[1:3]}
+                self._forecast_cache[key] = (now + self.forecast_ttl, copy.deepcopy(prediction))
+        
+        return prediction
+    
+    def _score_shadows(self, window, output, latency_ms):
+        """Hand a window the active model just scored to the shadow runner and keep it for replays"""
+        if self.shadow_runner is None:
+            return
+        data_version = self._current_data_version()
+        self._shadow_input = (self.model_id, data_version, np.array(window), output, latency_ms)
+        self.shadow_runner.submit(window, self.model_id, output, latency_ms, data_version)
+    
+    def _replay_shadows(self):
+        """Score the window behind a cached forecast with the shadow models again (sampled).
+        
+        The active model does not run again: replays only give the shadow
+        models fresh latency samples under the live request load.
+        Nothing is replayed once the model or the daily data has changed.
+        """
+        shadow_input = self._shadow_input
+        if self.shadow_runner is None or shadow_input is None:
+            return
+        if random.random() >= self.shadow_sample_rate:
+            return
+        model_id, data_version, window, output, latency_ms = shadow_input
+        if model_id != self.model_id or data_version != self._current_data_version():
+            return
+        self.shadow_runner.submit(window, model_id, output, latency_ms, data_version, replay=True)
+    
+    def predict_tomorrow_weather(self, use_cache=True):
+        """Predict tomorrow's weather, served from the forecast cache when possible"""
+        return self._cached_prediction(1, self._predict_uncached, use_cache)
+    
+    def predict_horizon(self, days=7, use_cache=True):
+        """Forecast the next `days` days; returns one prediction dict per day, or None"""
+        return self._cached_prediction(days, lambda: self._horizon_prediction(days), use_cache)
+    
+    def _online_horizon(self, days):
+        """Forecast from the online forecaster, or None if it is not available or not ready"""
+        if self.online_forecaster is None:
+            return None
+        forecasts = self.online_forecaster.forecast(days)
+        if forecasts is None:
+            return None
+        
+        today = datetime.now()
+        return [
+            {
+                'avg_temperature': round(float(tavg), 1),
+                'max_temperature': round(float(tmax), 1),
+                'min_temperature': round(float(tmin), 1),
+                'precipitation': 0.0,  # not measured by the sensor nodes
+                'prediction_date': (today + timedelta(days=step + 1)).strftime('%Y-%m-%d'),
+                'days_ahead': step + 1,
+                'model_used': 'Online_Holt',
+                'confidence': 'medium' if step < 3 else 'low',
+                'data_points_used': self.online_forecaster.get_stats()['days']
+            }
+            for step, (tavg, tmax, tmin) in enumerate(forecasts)
+        ]
+    
+    def _horizon_prediction(self, days):
+        """Autoregressive forecast: each predicted day is fed back as the newest window row"""
+        if self.interpreter_pool is None:
+            online = self._online_horizon(days)
+            if online:
+                return online
+        
+        try:
+            buckets, history = self.get_daily_history(30)
+        except Exception as e:
+            print(f"❌ Error getting dashboard data: {e}")
+            return None
+        
+        if len(history) < 3:
+            return None
+        
+        use_model = self.interpreter_pool is not None and len(history) >= 30
+        if not use_model and self.interpreter_pool is not None:
+            # Too little history for the model: same order as _predict_uncached
+            online = self._online_horizon(days)
+            if online:
+                return online
+        model_used = 'TensorFlow_Lite' if use_model else 'Statistical_Trend'
+        
+        # Rolling window buffer, shifted in place after every step
+        window = history[-30:].copy()
+        today = datetime.now()
+        predictions = []
+        
+        try:
+            for step in range(days):
+                target = today + timedelta(days=step + 1)
+                if use_model:
+                    started = time.perf_counter()
+                    output = self._run_model(window)
+                    if step == 0:
+                        # Only the first window is all measured data
+                        self._score_shadows(window, output, (time.perf_counter() - started) * 1000)
+                else:
+                    # Seasonal adjustment for the last day in the window, as for tomorrow
+                    output = self._statistical_forecast(window, (target - timedelta(days=1)).timetuple().tm_yday)
                 
-                # For now, set precipitation to 0 (could be enhanced with weather API)
-                precipitation = 0.0
+                # Drop the oldest day and append the prediction with its day-of-year features
+                window[:-1] = window[1:]
+                angle = 2 * np.pi * target.timetuple().tm_yday / 365
+                window[-1, :4] = output
+                window[-1, 4] = np.sin(angle)
+                window[-1, 5] = np.cos(angle)
                 
-                # Add seasonal component
-                date_obj = datetime.strptime(date, '%Y-%m-%d')
-                day_of_year = date_obj.timetuple().tm_yday
-                day_sin = math.sin(2 * math.pi * day_of_year / 365)
-                day_cos = math.cos(2 * math.pi * day_of_year / 365)
+                # Errors compound as predictions are fed back in
+                if step == 0:
+                    confidence = 'high' if use_model else 'medium'
+                else:
+                    confidence = 'medium' if step < 3 else 'low'
                 
-                weather_sequence.append([
-                    precipitation,  # prcp
-                    avg_temp,      # tavg
-                    max_temp,      # tmax
-                    min_temp,      # tmin
-                    day_sin,       # day_of_year_sin
-                    day_cos        # day_of_year_cos
-                ])
-            
-            return np.array(weather_sequence)
-            
+                predictions.append({
+                    'avg_temperature': round(float(output[1]), 1),
+                    'max_temperature': round(float(output[2]), 1),
+                    'min_temperature': round(float(output[3]), 1),
+                    'precipitation': round(float(output[0]), 1),
+                    'prediction_date': target.strftime('%Y-%m-%d'),
+                    'days_ahead': step + 1,
+                    'model_used': model_used,
+                    'confidence': confidence,
+                    'data_points_used': len(history)
+                })
         except Exception as e:
-            print(f"❌ Error getting dashboard data: {e}")
+            print(f"⚠️ Horizon prediction failed: {e}")
             return None
+        
+        return predictions
     
-    def predict_tomorrow_weather(self):
+    def _predict_uncached(self):
         """Predict tomorrow's weather using TensorFlow Lite model or statistical methods"""
         
         # Try TensorFlow Lite prediction first
@@ -192,36 +624,20 @@ class LightweightPredictor:
                 print("⚠️ Insufficient data for TensorFlow Lite prediction, using statistical method")
                 return self._statistical_prediction()
             
-            # Prepare input for TensorFlow Lite
-            input_details = self.interpreter.get_input_details()
-            output_details = self.interpreter.get_output_details()
+            # Run inference on the 30-day window
+            window = weather_sequence[-30:]
+            started = time.perf_counter()
+            output = self._run_model(window)
+            latency_ms = (time.perf_counter() - started) * 1000
             
-            # Normalize and reshape input
-            normalized_sequence = []
-            for row in weather_sequence:
-                normalized_row = [
-                    self._normalize_data(row[0], 'precipitation'),
-                    self._normalize_data(row[1], 'temperature'),
-                    self._normalize_data(row[2], 'temperature'),
-                    self._normalize_data(row[3], 'temperature'),
-                    row[4],  # day_sin (already normalized)
-                    row[5]   # day_cos (already normalized)
-                ]
-                normalized_sequence.append(normalized_row)
+            # Candidate models score the same window off the request path
+            self._score_shadows(window, output, latency_ms)
             
-            input_data = np.array([normalized_sequence], dtype=np.float32)
-            
-            # Run inference
-            self.interpreter.set_tensor(input_details[0]['index'], input_data)
-            self.interpreter.invoke()
-            output_data = self.interpreter.get_tensor(output_details[0]['index'])
-            
-            # Denormalize predictions
             prediction = {
-                'avg_temperature': self._denormalize_data(output_data[0][1], 'temperature'),
-                'max_temperature': self._denormalize_data(output_data[0][2], 'temperature'),
-                'min_temperature': self._denormalize_data(output_data[0][3], 'temperature'),
-                'precipitation': self._denormalize_data(output_data[0][0], 'precipitation'),
+                'avg_temperature': float(output[1]),
+                'max_temperature': float(output[2]),
+                'min_temperature': float(output[3]),
+                'precipitation': float(output[0]),
                 'prediction_date': (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d'),
                 'model_used': 'TensorFlow_Lite',
                 'confidence': 'high',
@@ -238,40 +654,50 @@ class LightweightPredictor:
             print(f"⚠️ TensorFlow Lite prediction failed: {e}")
             return self._statistical_prediction()
     
+    def _statistical_forecast(self, weather_data, day_of_year):
+        """Trend forecast for one window (days, 6) or a batch of windows (N, days, 6).
+        
+        Extrapolates the least-squares trend of the last 3 days of tavg/tmax/tmin
+        one day ahead, adds a seasonal adjustment for `day_of_year` (scalar or
+        one per window) and averages the last 7 days of precipitation.
+        Returns [prcp, tavg, tmax, tmin] per window.
+        """
+        recent = weather_data[..., -3:, 1:4]  # Last 3 days avg/max/min temps
+        
+        # Slope of a linear fit through days 1, 2, 3 is (y3 - y1) / 2
+        trend = (recent[..., 2, :] - recent[..., 0, :]) / 2
+        
+        # Predict tomorrow (day 4)
+        predicted = recent[..., 2, :] + trend
+        
+        seasonal_factor = 0.5 * np.sin(2 * np.pi * (np.asarray(day_of_year) - 80) / 365)
+        predicted = predicted + np.asarray(seasonal_factor)[..., np.newaxis]
+        
+        precipitation = weather_data[..., -7:, 0].mean(axis=-1)
+        return np.concatenate([precipitation[..., np.newaxis], predicted], axis=-1)
+    
     def _statistical_prediction(self):
         """Simple statistical prediction using recent trends"""
+        # Constant-time read when the online forecaster is fed by ingest
+        online = self._online_horizon(1)
+        if online:
+            return online[0]
+        
         try:
             weather_data = self.get_dashboard_data(7)  # Use last 7 days
             
             if weather_data is None or len(weather_data) < 3:
                 return self._fallback_prediction()
             
-            # Extract temperature trends
-            recent_temps = weather_data[-3:, 1]  # Last 3 days avg temps
-            recent_max_temps = weather_data[-3:, 2]  # Last 3 days max temps  
-            recent_min_temps = weather_data[-3:, 3]  # Last 3 days min temps
-            
-            # Calculate trends (linear regression coefficient)
-            days = np.array([1, 2, 3])
-            temp_trend = np.polyfit(days, recent_temps, 1)[0]
-            max_temp_trend = np.polyfit(days, recent_max_temps, 1)[0]
-            min_temp_trend = np.polyfit(days, recent_min_temps, 1)[0]
-            
-            # Predict tomorrow (day 4)
-            predicted_avg = recent_temps[-1] + temp_trend
-            predicted_max = recent_max_temps[-1] + max_temp_trend  
-            predicted_min = recent_min_temps[-1] + min_temp_trend
-            
-            # Add seasonal adjustment
-            today = datetime.now()
-            day_of_year = today.timetuple().tm_yday
-            seasonal_factor = 0.5 * math.sin(2 * math.pi * (day_of_year - 80) / 365)
+            # Seasonal adjustment for today
+            day_of_year = datetime.now().timetuple().tm_yday
+            predicted = self._statistical_forecast(weather_data, day_of_year)
             
             prediction = {
-                'avg_temperature': round(predicted_avg + seasonal_factor, 1),
-                'max_temperature': round(predicted_max + seasonal_factor, 1),
-                'min_temperature': round(predicted_min + seasonal_factor, 1),
-                'precipitation': round(np.mean(weather_data[-7:, 0]), 1),  # Average recent precipitation
+                'avg_temperature': round(float(predicted[1]), 1),
+                'max_temperature': round(float(predicted[2]), 1),
+                'min_temperature': round(float(predicted[3]), 1),
+                'precipitation': round(float(predicted[0]), 1),  # Average recent precipitation
                 'prediction_date': (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d'),
                 'model_used': 'Statistical_Trend',
                 'confidence': 'medium',
@@ -297,14 +723,15 @@ class LightweightPredictor:
     def _fallback_prediction(self):
         """Simple fallback prediction when model is unavailable"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             
             # Get recent average conditions
             recent_data = conn.execute('''
-                SELECT AVG(temperature) as avg_temp, AVG(humidity) as avg_humidity
-                FROM sensor_data 
-                WHERE timestamp > datetime('now', '-7 days')
-            ''').fetchone()
+                SELECT SUM(temperature_sum) / SUM(count) as avg_temp,
+                       SUM(humidity_sum) / SUM(count) as avg_humidity
+                FROM hourly_rollup 
+                WHERE station_id = ? AND bucket > ?
+            ''', (self.station_id, to_epoch(datetime.now() - timedelta(days=7)))).fetchone()
             
             conn.close()
             
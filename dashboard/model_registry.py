@@ -0,0 +1,134 @@
+"""
+Model registry
+A small JSON manifest (models/registry.json) naming each model version with
+its TFLite file and preprocessing config, which version is active and which
+versions run in shadow mode. A version may list `variants`: other builds of
+the same model (e.g. fp16/int8 exports from models/export_variants.py) with
+benchmark metrics, from which the predictor can pick the fastest one within
+an accuracy budget. Without a registry the predictor falls back to the fixed
+list of known model locations.
+
+    {
+      "active": "lstm-1.0.0",
+      "shadow": ["lstm-1.1.0-int8"],
+      "models": {
+        "lstm-1.0.0": {"model": "weather_prediction_model.tflite", "config": "model_config.json"},
+        "lstm-1.1.0-int8": {"model": "lstm-1.1.0-int8.tflite", "config": "lstm-1.1.0.json"}
+      }
+    }
+
+Paths are relative to the registry file.
+"""
+
+import json
+import os
+
+REGISTRY_PATH = os.path.join('models', 'registry.json')
+
+
+class ModelVersion:
+    """One registered model: its id, TFLite file and preprocessing config"""
+
+    def __init__(self, version_id, model_path, config_path, description=None, metrics_path=None, variants=()):
+        self.id = version_id
+        self.model_path = model_path
+        self.config_path = config_path
+        self.description = description
+        # Benchmark results written by export_variants.py next to the artifact
+        self.metrics_path = metrics_path or os.path.splitext(model_path)[0] + '.metrics.json'
+        self.variant_ids = list(variants)
+
+    @property
+    def available(self):
+        return os.path.exists(self.model_path)
+
+    @property
+    def metrics(self):
+        """Benchmark metrics dict, or None if the version was never benchmarked"""
+        if not os.path.exists(self.metrics_path):
+            return None
+        with open(self.metrics_path, 'r') as f:
+            return json.load(f)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'model': self.model_path,
+            'config': self.config_path,
+            'description': self.description,
+            'available': self.available,
+            'variants': self.variant_ids
+        }
+
+
+class ModelRegistry:
+    """Model versions with one active version and any number of shadow versions"""
+
+    def __init__(self, versions, active=None, shadow=()):
+        self.versions = versions
+        variant_ids = [variant_id for version in versions.values() for variant_id in version.variant_ids]
+        for version_id in [active, *shadow, *variant_ids]:
+            if version_id is not None and version_id not in versions:
+                raise ValueError(f"Model version '{version_id}' is not registered")
+        self.active_id = active
+        self.shadow_ids = [version_id for version_id in shadow if version_id != active]
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        """Read a registry file; returns None if it doesn't exist"""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+
+        base = os.path.dirname(path)
+        versions = {}
+        for version_id, entry in manifest.get('models', {}).items():
+            config = entry.get('config')
+            metrics = entry.get('metrics')
+            versions[version_id] = ModelVersion(
+                version_id,
+                os.path.join(base, entry['model']),
+                os.path.join(base, config) if config else None,
+                entry.get('description'),
+                os.path.join(base, metrics) if metrics else None,
+                entry.get('variants', [])
+            )
+        return cls(versions, manifest.get('active'), manifest.get('shadow', []))
+
+    @property
+    def active(self):
+        return self.versions.get(self.active_id)
+
+    @property
+    def shadows(self):
+        return [self.versions[version_id] for version_id in self.shadow_ids]
+
+    def choose_variant(self, version, mae_budget):
+        """Fastest available build of `version` whose temperature MAE is within budget.
+
+        `mae_budget` is the allowed increase in mean temperature MAE (°C) over
+        `version` itself. Builds without metrics are never chosen; `version`
+        is returned when it has no metrics or no variant qualifies.
+        """
+        baseline = version.metrics
+        if baseline is None:
+            return version
+
+        best, best_latency = version, baseline['latency_ms']['p50']
+        limit = baseline['temperature_mae'] + mae_budget
+        for variant_id in version.variant_ids:
+            variant = self.versions[variant_id]
+            metrics = variant.metrics
+            if not variant.available or metrics is None or metrics['temperature_mae'] > limit:
+                continue
+            if metrics['latency_ms']['p50'] < best_latency:
+                best, best_latency = variant, metrics['latency_ms']['p50']
+        return best
+
+    def to_dict(self):
+        return {
+            'active': self.active_id,
+            'shadow': self.shadow_ids,
+            'models': [version.to_dict() for version in self.versions.values()]
+        }
@@ -0,0 +1,124 @@
+"""
+Model file watcher
+Polls the TFLite model, its config and the model registry for changes and
+hot-reloads the predictor when their content changes, so a retrained model
+can be deployed without restarting the dashboard. Replace files atomically
+(copy next to the target, then `mv`) so a half-written model is never picked
+up.
+"""
+
+import os
+import threading
+from datetime import datetime
+
+from model_integration import model_digest
+
+
+def _file_signature(path):
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+class ModelWatcher:
+    """Background thread that reloads the predictor's model when its files change.
+
+    A cheap (mtime, size) check runs every `interval_seconds`; the files are
+    only hashed when that signature changes, and the model is only reloaded
+    when the hash differs from the active model's. A changed registry also
+    reloads the shadow models. `on_reload` is called after a successful swap
+    (e.g. to refresh the stored forecast).
+    """
+
+    def __init__(self, predictor, interval_seconds=30, on_reload=None):
+        self.predictor = predictor
+        self.interval_seconds = interval_seconds
+        self.on_reload = on_reload
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._signature = None
+
+        # Statistics
+        self._checks = 0
+        self._reloads = 0
+        self._failures = 0
+        self._last_reload = None
+
+    def start(self):
+        """Start the watcher thread (no-op if it is already running)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._signature = self._current_signature()
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopping = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def _current_signature(self):
+        registry = _file_signature(self.predictor.registry_path) if self.predictor.registry_path else None
+        files = self.predictor.find_model_files()
+        if files is None:
+            return (None, None, None, registry)
+        return (files, _file_signature(files[0]), _file_signature(files[1]), registry)
+
+    def check(self):
+        """Reload the model if its files changed; returns True if a new model was swapped in"""
+        self._checks += 1
+        signature = self._current_signature()
+        if signature == self._signature:
+            return False
+        registry_changed = self._signature is not None and signature[3] != self._signature[3]
+        self._signature = signature
+
+        if registry_changed:
+            self.predictor.load_shadow_models()
+        if signature[0] is None:
+            return False
+
+        model_path, config_path = signature[0]
+        if model_digest(model_path, config_path) == self.predictor.model_digest:
+            return False
+
+        if not self.predictor.reload_model(model_path, config_path):
+            self._failures += 1
+            return False
+
+        self._reloads += 1
+        self._last_reload = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if self.on_reload:
+            self.on_reload()
+        return True
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval_seconds)
+            if self._stopping:
+                return
+            try:
+                self.check()
+            except Exception as e:
+                self._failures += 1
+                print(f"⚠️ Model watcher check failed: {e}")
+
+    def get_stats(self):
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'interval_seconds': self.interval_seconds,
+            'model_id': self.predictor.model_id,
+            'checks': self._checks,
+            'reloads': self._reloads,
+            'failures': self._failures,
+            'last_reload': self._last_reload
+        }
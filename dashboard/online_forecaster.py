@@ -0,0 +1,234 @@
+"""
+Online statistical forecaster
+Keeps a damped Holt (level + trend) model of daily average, maximum and
+minimum temperature that is updated in constant time per reading: readings
+accumulate into the current day and the model is updated once when a day
+closes. Forecasting is a handful of arithmetic operations. The state is
+persisted to SQLite periodically and caught up from the daily rollups at
+startup.
+"""
+
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from hot_state import DEFAULT_STATION
+
+SERIES = ('avg_temperature', 'max_temperature', 'min_temperature')
+STATE_NAME = 'holt_daily_temperature'
+
+# Oldest last closed day (days before today) the model still forecasts from.
+# Older state, e.g. after the station was offline, is not extrapolated across
+# the gap; callers fall back to the rollup trend instead
+MAX_STALE_DAYS = 2
+
+
+def create_state_table(conn):
+    """Create the table holding persisted forecaster state"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS forecaster_state (
+            name TEXT PRIMARY KEY,
+            state TEXT NOT NULL,            -- JSON
+            updated_at INTEGER NOT NULL     -- epoch seconds
+        )
+    ''')
+
+
+def _next_day(day):
+    """Epoch of the local midnight after the local midnight `day` (DST-safe)"""
+    return int((datetime.fromtimestamp(day) + timedelta(days=1)).timestamp())
+
+
+def _days_before_today(day):
+    """Whole days from the local midnight `day` to today's local midnight"""
+    return (date.today() - date.fromtimestamp(day)).days
+
+
+class OnlineForecaster:
+    """Damped Holt linear trend over one station's daily temperature aggregates.
+
+    alpha smooths the level, beta the trend, and phi damps the trend so
+    multi-day forecasts flatten out instead of running away.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1, phi=0.9, save_interval=300, station_id=DEFAULT_STATION):
+        self.station_id = station_id
+        self.alpha = alpha
+        self.beta = beta
+        self.phi = phi
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+
+        # Model state: one entry per series
+        self._level = None
+        self._trend = None
+        self._days = 0
+        self._last_closed = None
+
+        # Aggregates of the day in progress
+        self._day = None
+        self._day_end = None
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+
+        self._updates = 0
+        self._last_saved = time.monotonic()
+
+    @property
+    def ready(self):
+        """At least two closed days, so there is a trend, the last of them recent"""
+        return (self._days >= 2 and self._last_closed is not None
+                and _days_before_today(self._last_closed) <= MAX_STALE_DAYS)
+
+    def _open_day(self, day, count=0, total=0.0, minimum=None, maximum=None):
+        self._day = day
+        self._day_end = _next_day(day)
+        self._count = count
+        self._sum = total
+        self._min = minimum
+        self._max = maximum
+
+    def _close_day(self):
+        """Fold the finished day into the Holt level and trend"""
+        if self._count:
+            values = np.array([self._sum / self._count, self._max, self._min])
+            if self._level is None:
+                self._level = values
+                self._trend = np.zeros(len(SERIES))
+            else:
+                previous = self._level
+                self._level = self.alpha * values + (1 - self.alpha) * (previous + self.phi * self._trend)
+                self._trend = self.beta * (self._level - previous) + (1 - self.beta) * self.phi * self._trend
+            self._days += 1
+            self._last_closed = self._day
+
+    def update(self, readings):
+        """Add readings: list of (ts, temperature, humidity, pressure, station_id) tuples.
+
+        Readings of other stations, and readings for a day before the one in
+        progress (late backfills), are ignored here; they are still counted
+        in the rollups.
+        """
+        with self._lock:
+            for ts, temperature, _, _, station in readings:
+                if ts is None or (station or DEFAULT_STATION) != self.station_id:
+                    continue
+                if self._day is None or ts >= self._day_end:
+                    if self._day is not None:
+                        self._close_day()
+                    local = datetime.fromtimestamp(ts)
+                    self._open_day(int(local.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()))
+                elif ts < self._day:
+                    continue
+
+                self._count += 1
+                self._sum += temperature
+                self._min = temperature if self._min is None else min(self._min, temperature)
+                self._max = temperature if self._max is None else max(self._max, temperature)
+            self._updates += len(readings)
+
+    def forecast(self, days=1):
+        """Next `days` days from tomorrow on: list of [tavg, tmax, tmin] arrays.
+
+        None until the model is ready, or when no day closed in the last
+        MAX_STALE_DAYS days.
+        """
+        with self._lock:
+            if not self.ready:
+                return None
+            level, trend, last_closed = self._level, self._trend, self._last_closed
+
+        # Steps from the last closed day to tomorrow (normally 2: today is still open)
+        tomorrow = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        first_step = max(1, round((tomorrow.timestamp() - last_closed) / 86400))
+
+        forecasts = []
+        for step in range(first_step, first_step + days):
+            # Damped trend: trend * (phi + phi^2 + ... + phi^step)
+            damping = sum(self.phi ** i for i in range(1, step + 1))
+            forecasts.append(level + damping * trend)
+        return forecasts
+
+    def get_state(self):
+        with self._lock:
+            return {
+                'level': self._level.tolist() if self._level is not None else None,
+                'trend': self._trend.tolist() if self._trend is not None else None,
+                'days': self._days,
+                'last_closed': self._last_closed,
+                'day': self._day,
+                'count': self._count,
+                'sum': self._sum,
+                'min': self._min,
+                'max': self._max
+            }
+
+    def set_state(self, state):
+        with self._lock:
+            self._level = np.array(state['level']) if state['level'] is not None else None
+            self._trend = np.array(state['trend']) if state['trend'] is not None else None
+            self._days = state['days']
+            self._last_closed = state['last_closed']
+            if state['day'] is not None:
+                self._open_day(state['day'], state['count'], state['sum'], state['min'], state['max'])
+
+    def save(self, conn):
+        """Persist the state"""
+        state = json.dumps(self.get_state())
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO forecaster_state (name, state, updated_at) VALUES (?, ?, ?)',
+                (STATE_NAME, state, int(time.time()))
+            )
+        self._last_saved = time.monotonic()
+
+    def save_if_due(self, conn):
+        """Persist the state if `save_interval` seconds passed since the last save"""
+        if time.monotonic() - self._last_saved >= self.save_interval:
+            self.save(conn)
+            return True
+        return False
+
+    def restore(self, conn):
+        """Load the persisted state and catch up on days from the daily rollups.
+
+        Without a saved state the model is built from the whole daily history.
+        The day in progress is always taken from its rollup row, so readings
+        stored after the last save are not lost.
+        """
+        row = conn.execute('SELECT state FROM forecaster_state WHERE name = ?', (STATE_NAME,)).fetchone()
+        if row:
+            self.set_state(json.loads(row[0]))
+
+        with self._lock:
+            since = self._day if self._day is not None else 0
+        days = conn.execute('''
+            SELECT bucket, count, temperature_sum, temperature_min, temperature_max
+            FROM daily_rollup
+            WHERE station_id = ? AND bucket >= ?
+            ORDER BY bucket
+        ''', (self.station_id, since)).fetchall()
+
+        with self._lock:
+            for i, (bucket, count, total, minimum, maximum) in enumerate(days):
+                self._open_day(bucket, count, total, minimum, maximum)
+                if i < len(days) - 1:
+                    self._close_day()
+
+        return len(days)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'days': self._days,
+                'readings': self._updates,
+                'day_in_progress': datetime.fromtimestamp(self._day).strftime('%Y-%m-%d') if self._day else None,
+                'level': [round(v, 2) for v in self._level.tolist()] if self._level is not None else None,
+                'trend': [round(v, 3) for v in self._trend.tolist()] if self._trend is not None else None
+            }
@@ -0,0 +1,113 @@
+"""
+Feature scaling shared by the dashboard and edge predictors
+Loads the MinMaxScaler parameters saved with the model (scale_ and min_ in
+model_config.json) once into contiguous float32 arrays and applies them to
+whole windows or batches of windows in one vectorized expression, exactly as
+sklearn's MinMaxScaler does during training.
+"""
+
+import json
+
+import numpy as np
+
+# Ranges used when a model ships without scaler parameters
+DEFAULT_FEATURE_RANGES = {
+    'precipitation': {'min': 0, 'max': 100},
+    'temperature': {'min': -20, 'max': 50}
+}
+
+# Range used for each model feature (prcp, tavg, tmax, tmin, day_sin, day_cos)
+FEATURE_RANGE_NAMES = ['precipitation', 'temperature', 'temperature', 'temperature', None, None]
+
+
+class Preprocessor:
+    """MinMaxScaler transform: scaled = X * scale + min, X = (scaled - min) / scale"""
+
+    def __init__(self, scale_values, min_values):
+        self.scale = np.ascontiguousarray(scale_values, dtype=np.float32)
+        self.min = np.ascontiguousarray(min_values, dtype=np.float32)
+        if self.scale.shape != self.min.shape or self.scale.ndim != 1:
+            raise ValueError("scale_values and min_values must be 1-D arrays of the same length")
+        self.inv_scale = (1.0 / self.scale).astype(np.float32)
+
+    @property
+    def n_features(self):
+        return len(self.scale)
+
+    @classmethod
+    def from_config(cls, config):
+        """From a model config dict: `preprocessing` scaler values, else `feature_ranges`, else defaults"""
+        config = config or {}
+        if 'preprocessing' in config:
+            return cls(config['preprocessing']['scale_values'], config['preprocessing']['min_values'])
+        return cls.from_feature_ranges(config.get('feature_ranges', DEFAULT_FEATURE_RANGES))
+
+    @classmethod
+    def load(cls, config_path):
+        with open(config_path, 'r') as f:
+            return cls.from_config(json.load(f))
+
+    @classmethod
+    def from_feature_ranges(cls, ranges):
+        """Scaler equivalent to min-max normalizing each feature to its {'min', 'max'} range"""
+        scale = np.ones(len(FEATURE_RANGE_NAMES))
+        offset = np.zeros(len(FEATURE_RANGE_NAMES))
+        for i, name in enumerate(FEATURE_RANGE_NAMES):
+            if name in ranges:
+                low, high = ranges[name]['min'], ranges[name]['max']
+                scale[i] = 1.0 / (high - low)
+                offset[i] = -low * scale[i]
+        return cls(scale, offset)
+
+    def transform(self, data, out=None):
+        """Scale (..., n_features) windows; `out` may be a float32 buffer such as a tensor view"""
+        out = np.multiply(data, self.scale, out=out, casting='unsafe')
+        out += self.min
+        return out
+
+    def inverse_transform(self, data):
+        """Unscale (..., k) data holding the first k features (e.g. the 4 model targets)"""
+        k = np.shape(data)[-1]
+        return (np.asarray(data, dtype=np.float32) - self.min[:k]) * self.inv_scale[:k]
+
+
+def test_parity():
+    """Check transform/inverse_transform against sklearn's MinMaxScaler"""
+    print("🧪 Testing preprocessing parity with MinMaxScaler...")
+    try:
+        from sklearn.preprocessing import MinMaxScaler
+    except ImportError:
+        print("⚠️ scikit-learn not installed, skipping parity test")
+        return None
+
+    rng = np.random.default_rng(42)
+    history = np.column_stack([
+        rng.gamma(0.5, 8, 2000),                    # prcp
+        rng.normal(18, 7, 2000),                    # tavg
+        rng.normal(24, 7, 2000),                    # tmax
+        rng.normal(12, 6, 2000),                    # tmin
+        np.sin(np.linspace(0, 40, 2000)),           # day_of_year_sin
+        np.cos(np.linspace(0, 40, 2000))            # day_of_year_cos
+    ])
+    scaler = MinMaxScaler().fit(history)
+    preprocessor = Preprocessor.from_config({
+        'preprocessing': {'scale_values': scaler.scale_.tolist(), 'min_values': scaler.min_.tolist()}
+    })
+
+    batch = history[:300].reshape(10, 30, 6)
+    expected = scaler.transform(history[:300]).reshape(10, 30, 6)
+    scaled = preprocessor.transform(batch, out=np.empty(batch.shape, dtype=np.float32))
+    targets = scaler.transform(history[300:310])[:, :4]
+
+    checks = {
+        'transform': np.allclose(scaled, expected, atol=1e-5),
+        'inverse_transform': np.allclose(preprocessor.inverse_transform(targets), history[300:310, :4],
+                                         rtol=1e-5, atol=1e-3)
+    }
+    for name, passed in checks.items():
+        print(f"   {name}: {'✅' if passed else '❌'}")
+    return all(checks.values())
+
+
+if __name__ == '__main__':
+    test_parity()
@@ -0,0 +1,192 @@
+"""
+Hourly and daily rollups of sensor readings
+Keeps count/sum/min/max/last aggregates per station and local hour/day,
+updated incrementally in the same transaction as each insert, so forecasting,
+charts and exports can read a handful of precomputed rows instead of raw data.
+"""
+
+import sys
+from datetime import datetime
+
+from database import get_connection
+from hot_state import DEFAULT_STATION
+
+ROLLUP_TABLES = ('hourly_rollup', 'daily_rollup')
+
+# Rows read per chunk when rebuilding from sensor_data
+REBUILD_CHUNK_SIZE = 10000
+
+_ROLLUP_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        station_id TEXT NOT NULL,
+        bucket INTEGER NOT NULL,           -- epoch seconds at the start of the local hour/day
+        count INTEGER NOT NULL,
+        temperature_sum FLOAT NOT NULL,
+        temperature_min FLOAT NOT NULL,
+        temperature_max FLOAT NOT NULL,
+        temperature_last FLOAT NOT NULL,
+        humidity_sum FLOAT NOT NULL,
+        humidity_min FLOAT NOT NULL,
+        humidity_max FLOAT NOT NULL,
+        humidity_last FLOAT NOT NULL,
+        pressure_count INTEGER NOT NULL DEFAULT 0,
+        pressure_sum FLOAT NOT NULL DEFAULT 0,
+        pressure_min FLOAT,
+        pressure_max FLOAT,
+        pressure_last FLOAT,
+        last_ts INTEGER NOT NULL,
+        PRIMARY KEY (station_id, bucket)
+    )
+'''
+
+# Merge a pre-aggregated bucket into the stored one; SET expressions see the old row
+_UPSERT = '''
+    INSERT INTO {table} (
+        bucket, count,
+        temperature_sum, temperature_min, temperature_max, temperature_last,
+        humidity_sum, humidity_min, humidity_max, humidity_last,
+        pressure_count, pressure_sum, pressure_min, pressure_max, pressure_last,
+        last_ts, station_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(station_id, bucket) DO UPDATE SET
+        count = count + excluded.count,
+        temperature_sum = temperature_sum + excluded.temperature_sum,
+        temperature_min = MIN(temperature_min, excluded.temperature_min),
+        temperature_max = MAX(temperature_max, excluded.temperature_max),
+        temperature_last = CASE WHEN excluded.last_ts >= last_ts
+                                THEN excluded.temperature_last ELSE temperature_last END,
+        humidity_sum = humidity_sum + excluded.humidity_sum,
+        humidity_min = MIN(humidity_min, excluded.humidity_min),
+        humidity_max = MAX(humidity_max, excluded.humidity_max),
+        humidity_last = CASE WHEN excluded.last_ts >= last_ts
+                             THEN excluded.humidity_last ELSE humidity_last END,
+        pressure_count = pressure_count + excluded.pressure_count,
+        pressure_sum = pressure_sum + excluded.pressure_sum,
+        pressure_min = COALESCE(MIN(pressure_min, excluded.pressure_min), pressure_min, excluded.pressure_min),
+        pressure_max = COALESCE(MAX(pressure_max, excluded.pressure_max), pressure_max, excluded.pressure_max),
+        pressure_last = CASE WHEN excluded.last_ts >= last_ts AND excluded.pressure_last IS NOT NULL
+                             THEN excluded.pressure_last ELSE pressure_last END,
+        last_ts = MAX(last_ts, excluded.last_ts)
+'''
+
+
+def create_rollup_tables(conn):
+    """Create the rollup tables if they don't exist"""
+    for table in ROLLUP_TABLES:
+        conn.execute(_ROLLUP_SCHEMA.format(table=table))
+        # Time-range reads across all stations (the primary key leads with the station)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table} (bucket)')
+
+
+def _bucket_starts(ts_values):
+    """Map epoch seconds to (local hour start, local day start) epochs.
+
+    Every UTC offset and DST switch falls on a 15-minute boundary, so the
+    conversion is memoized per 15-minute slot.
+    """
+    cache = {}
+    starts = []
+    for ts in ts_values:
+        slot = ts // 900
+        bucket = cache.get(slot)
+        if bucket is None:
+            local = datetime.fromtimestamp(ts)
+            hour = local.replace(minute=0, second=0, microsecond=0)
+            day = hour.replace(hour=0)
+            bucket = (int(hour.timestamp()), int(day.timestamp()))
+            cache[slot] = bucket
+        starts.append(bucket)
+    return starts
+
+
+def _aggregate(readings, buckets):
+    """Fold readings into one aggregate row per station and bucket"""
+    aggregates = {}
+    for (ts, temperature, humidity, pressure, station), bucket in zip(readings, buckets):
+        agg = aggregates.get((station, bucket))
+        if agg is None:
+            agg = aggregates[(station, bucket)] = [
+                bucket, 0,
+                0.0, temperature, temperature, temperature,
+                0.0, humidity, humidity, humidity,
+                0, 0.0, None, None, None,
+                ts, station
+            ]
+        agg[1] += 1
+        agg[2] += temperature
+        agg[3] = min(agg[3], temperature)
+        agg[4] = max(agg[4], temperature)
+        agg[6] += humidity
+        agg[7] = min(agg[7], humidity)
+        agg[8] = max(agg[8], humidity)
+        if pressure is not None:
+            agg[10] += 1
+            agg[11] += pressure
+            agg[12] = pressure if agg[12] is None else min(agg[12], pressure)
+            agg[13] = pressure if agg[13] is None else max(agg[13], pressure)
+        if ts >= agg[15]:
+            agg[5] = temperature
+            agg[9] = humidity
+            if pressure is not None:
+                agg[14] = pressure
+            agg[15] = ts
+    return list(aggregates.values())
+
+
+def apply_readings(conn, readings):
+    """Add readings to the hourly and daily rollups.
+
+    readings: list of (ts, temperature, humidity, pressure, station_id)
+    tuples; a station_id of None means the default station. Must be called
+    inside the transaction that inserts the readings.
+    Returns the set of (station_id, daily bucket) pairs that were touched.
+    """
+    readings = [(ts, temperature, humidity, pressure, station or DEFAULT_STATION)
+                for ts, temperature, humidity, pressure, station in readings if ts is not None]
+    if not readings:
+        return set()
+
+    starts = _bucket_starts([r[0] for r in readings])
+    hourly = _aggregate(readings, [hour for hour, _ in starts])
+    daily = _aggregate(readings, [day for _, day in starts])
+
+    conn.executemany(_UPSERT.format(table='hourly_rollup'), hourly)
+    conn.executemany(_UPSERT.format(table='daily_rollup'), daily)
+    return {(row[16], row[0]) for row in daily}
+
+
+def rebuild_rollups(conn):
+    """Recompute both rollup tables from sensor_data"""
+    create_rollup_tables(conn)
+    with conn:
+        for table in ROLLUP_TABLES:
+            conn.execute(f'DELETE FROM {table}')
+
+        # Databases from before migration 4 have no station column yet
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(sensor_data)')]
+        station = 'station_id' if 'station_id' in columns else 'NULL'
+        cursor = conn.execute(f'''
+            SELECT ts, temperature, humidity, pressure, {station}
+            FROM sensor_data
+            WHERE ts IS NOT NULL
+            ORDER BY ts
+        ''')
+        total = 0
+        while True:
+            rows = cursor.fetchmany(REBUILD_CHUNK_SIZE)
+            if not rows:
+                break
+            apply_readings(conn, [tuple(row) for row in rows])
+            total += len(rows)
+
+    print(f"Rebuilt rollups from {total} readings")
+    return total
+
+
+if __name__ == '__main__':
+    # Usage: python3 rollups.py [db_path]
+    conn = get_connection(sys.argv[1] if len(sys.argv) > 1 else 'weather.db')
+    try:
+        rebuild_rollups(conn)
+    finally:
+        conn.close()
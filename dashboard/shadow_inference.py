@@ -0,0 +1,197 @@
+"""
+Shadow inference for candidate models
+Every time the active model predicts tomorrow's weather, its input window is
+handed to a background thread that runs the same window through each shadow
+model and records all outputs and latencies in the `shadow_predictions`
+table. Windows behind cached forecasts can be replayed for more latency
+samples; replays only add shadow rows. Candidate (e.g. quantized or retrained) models are evaluated under real
+load without adding latency to the request that triggered the prediction.
+"""
+
+import threading
+import time
+from queue import Queue, Empty, Full
+
+import numpy as np
+
+from database import get_connection
+
+SHADOW_COLUMNS = (
+    'ts', 'data_version', 'model_id', 'role', 'precipitation', 'avg_temperature',
+    'max_temperature', 'min_temperature', 'latency_ms', 'active_id'
+)
+
+
+def create_shadow_table(conn):
+    """Create the table recording active and shadow model outputs"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS shadow_predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts INTEGER NOT NULL,                -- epoch seconds of the active prediction
+            data_version INTEGER,               -- newest daily rollup bucket in the window
+            model_id TEXT NOT NULL,
+            role TEXT NOT NULL,                 -- 'active', 'shadow' or 'replay'
+            precipitation FLOAT,
+            avg_temperature FLOAT,
+            max_temperature FLOAT,
+            min_temperature FLOAT,
+            latency_ms FLOAT,
+            active_id INTEGER                   -- shadow/replay rows: the active row compared with
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_shadow_predictions_model_ts
+        ON shadow_predictions (model_id, ts)
+    ''')
+
+
+class ShadowRunner:
+    """Background thread running shadow models on the active model's input windows.
+
+    `submit()` never blocks: when `max_pending` windows are already queued
+    the new one is dropped. Shadow models are LoadedModel objects (see
+    model_integration.py) set with `set_models()`.
+
+    A replay (`replay=True`) scores a window the active model already scored
+    without running it again: only 'replay' rows are written, linked to the
+    active row of the original run, and they count towards latency but not
+    towards the agreement statistics.
+    """
+
+    def __init__(self, db_path='weather.db', max_pending=4):
+        self.db_path = db_path
+        self._queue = Queue(maxsize=max_pending)
+        self._models = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Statistics
+        self._submitted = 0
+        self._dropped = 0
+        self._runs = 0
+        self._replays = 0
+        self._errors = 0
+        self._last_active = None    # ((active model id, data version), id of the latest active row)
+        self._latency = {}          # model id -> (runs, total latency ms)
+        self._temperature_diff = {}  # shadow model id -> (runs, total |avg temperature - active|)
+
+    @property
+    def models(self):
+        return list(self._models)
+
+    def set_models(self, models):
+        """Replace the shadow models (list of LoadedModel)"""
+        self._models = list(models)
+
+    def start(self):
+        """Start the shadow thread (no-op if it is already running)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='shadow-inference', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+
+    def submit(self, window, active_model_id, active_output, active_latency_ms, data_version=None,
+               replay=False):
+        """Queue a (30, 6) window the active model scored; returns False if dropped"""
+        if not self._models:
+            return False
+        job = (int(time.time()), np.array(window, dtype=np.float32), active_model_id,
+               np.asarray(active_output, dtype=np.float32), active_latency_ms, data_version, replay)
+        try:
+            self._queue.put_nowait(job)
+        except Full:
+            self._dropped += 1
+            return False
+        self._submitted += 1
+        return True
+
+    def _record_latency(self, model_id, latency_ms):
+        runs, total = self._latency.get(model_id, (0, 0.0))
+        self._latency[model_id] = (runs + 1, total + latency_ms)
+
+    def run_job(self, job):
+        """Score one window with every shadow model and store the rows"""
+        ts, window, active_model_id, active_output, active_latency_ms, data_version, replay = job
+        key = (active_model_id, data_version)
+        if replay and (self._last_active is None or self._last_active[0] != key):
+            # The original run was dropped or failed: nothing to link the replay to
+            return []
+        if not replay:
+            self._record_latency(active_model_id, active_latency_ms)
+
+        rows = []
+        for model in self._models:
+            started = time.perf_counter()
+            try:
+                output = model.predict_batch(window[np.newaxis])[0]
+            except Exception as e:
+                self._errors += 1
+                print(f"⚠️ Shadow model {model.model_id} failed: {e}")
+                continue
+            latency_ms = (time.perf_counter() - started) * 1000
+
+            rows.append([ts, data_version, model.model_id, 'replay' if replay else 'shadow',
+                         *map(float, output), latency_ms, None])
+            self._record_latency(model.model_id, latency_ms)
+            if not replay:
+                runs, total = self._temperature_diff.get(model.model_id, (0, 0.0))
+                self._temperature_diff[model.model_id] = (runs + 1, total + abs(float(output[1] - active_output[1])))
+
+        insert = (f"INSERT INTO shadow_predictions ({', '.join(SHADOW_COLUMNS)}) "
+                  f"VALUES ({', '.join('?' for _ in SHADOW_COLUMNS)})")
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                if replay:
+                    active_id = self._last_active[1]
+                else:
+                    active_id = conn.execute(insert, (ts, data_version, active_model_id, 'active',
+                                                      *map(float, active_output), active_latency_ms,
+                                                      None)).lastrowid
+                for row in rows:
+                    row[-1] = active_id
+                conn.executemany(insert, rows)
+        finally:
+            conn.close()
+        if replay:
+            self._replays += 1
+        else:
+            self._last_active = (key, active_id)
+            self._runs += 1
+        return rows
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=1)
+            except Empty:
+                continue
+            if job is None:
+                return
+            try:
+                self.run_job(job)
+            except Exception as e:
+                self._errors += 1
+                print(f"⚠️ Shadow inference failed: {e}")
+
+    def get_stats(self):
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'models': [model.model_id for model in self._models],
+            'pending': self._queue.qsize(),
+            'submitted': self._submitted,
+            'dropped': self._dropped,
+            'runs': self._runs,
+            'replays': self._replays,
+            'errors': self._errors,
+            'avg_latency_ms': {model_id: round(total / runs, 3)
+                               for model_id, (runs, total) in self._latency.items()},
+            'avg_temperature_diff': {model_id: round(total / runs, 3)
+                                     for model_id, (runs, total) in self._temperature_diff.items()}
+        }
@@ -0,0 +1,70 @@
+"""
+Regression tests for the online forecaster's staleness check
+Run from the dashboard directory: python -m pytest test_online_forecaster.py
+"""
+
+from datetime import datetime, timedelta
+
+from database import get_connection
+from init_db import init_db
+from model_integration import LightweightPredictor
+from online_forecaster import OnlineForecaster
+from rollups import apply_readings
+
+
+def _seed_days(db_path, last_day, days=10, temperature=21.0):
+    """Hourly readings at a constant temperature for `days` days ending on `last_day`"""
+    start = datetime.combine(last_day, datetime.min.time()) - timedelta(days=days - 1)
+    readings = [
+        (int((start + timedelta(hours=hour)).timestamp()), temperature, 50.0, None, 'default')
+        for hour in range(days * 24)
+    ]
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            apply_readings(conn, readings)
+    finally:
+        conn.close()
+
+
+def _restored_forecaster(db_path):
+    forecaster = OnlineForecaster()
+    conn = get_connection(db_path)
+    try:
+        forecaster.restore(conn)
+    finally:
+        conn.close()
+    return forecaster
+
+
+def test_stale_state_falls_back_to_rollup_trend(tmp_path):
+    db_path = str(tmp_path / 'weather.db')
+    init_db(db_path)
+    _seed_days(db_path, datetime.now().date() - timedelta(days=300))
+
+    forecaster = _restored_forecaster(db_path)
+    assert forecaster.get_stats()['days'] >= 2
+    assert not forecaster.ready
+    assert forecaster.forecast(7) is None
+
+    predictor = LightweightPredictor(db_path, online_forecaster=forecaster)
+    prediction = predictor._statistical_prediction()
+    assert prediction['model_used'] == 'Statistical_Trend'
+    assert abs(prediction['avg_temperature'] - 21.0) <= 1.0
+
+    horizon = predictor._horizon_prediction(7)
+    assert all(day['model_used'] != 'Online_Holt' for day in horizon)
+
+
+def test_recent_state_is_used(tmp_path):
+    db_path = str(tmp_path / 'weather.db')
+    init_db(db_path)
+    _seed_days(db_path, datetime.now().date())
+
+    forecaster = _restored_forecaster(db_path)
+    assert forecaster.ready
+
+    predictor = LightweightPredictor(db_path, online_forecaster=forecaster)
+    prediction = predictor._statistical_prediction()
+    assert prediction['model_used'] == 'Online_Holt'
+    assert abs(prediction['avg_temperature'] - 21.0) <= 1.0
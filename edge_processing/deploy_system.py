@@ -157,6 +157,8 @@ def create_edge_deployment_package():
         ("/home/tauya/Desktop/Project Final/edge-model/training/weather_prediction_model.tflite", "model.tflite"),
         ("/home/tauya/Desktop/Project Final/edge-model/training/model_config.json", "config.json"),
         ("/home/tauya/Desktop/Project Final/edge-model/training/edge_predictor.py", "predictor.py"),
+        # Scaler shared with the dashboard; predictor.py imports it
+        ("/home/tauya/Desktop/Project Final/weather-dashboard/preprocessing.py", "preprocessing.py"),
         ("/home/tauya/Desktop/Project Final/weather-dashboard/sensor_node_example.py", "sensor_example.py")
     ]
     
@@ -172,6 +174,7 @@ def create_edge_deployment_package():
 - `model.tflite` - Optimized LSTM model for predictions
 - `config.json` - Model configuration and preprocessing parameters
 - `predictor.py` - Python class for making predictions
+- `preprocessing.py` - Input scaling shared with the dashboard (required by `predictor.py`)
 - `sensor_example.py` - Example sensor integration code
 
 ## Installation on Edge Device:
@@ -90,13 +90,26 @@ print_status "Python environment setup complete!"
 print_step "Step 7: Creating project structure..."
 mkdir -p templates static models
 
-# Create basic app.py if it doesn't exist
-if [ ! -f "app.py" ]; then
-    print_warning "app.py not found. You'll need to copy your project files manually."
+# Dashboard modules app.py needs at runtime (preprocessing.py is also
+# imported by edge_predictor.py)
+REQUIRED_FILES="app.py backup_outbox.py database.py downsample.py events.py
+firebase_backup.py forecast_scheduler.py hot_state.py ingest_queue.py
+init_db.py interpreter_pool.py model_integration.py model_registry.py
+model_watcher.py online_forecaster.py preprocessing.py rollups.py
+shadow_inference.py"
+
+MISSING_FILES=""
+for file in $REQUIRED_FILES; do
+    [ -f "$file" ] || MISSING_FILES="$MISSING_FILES $file"
+done
+
+if [ -n "$MISSING_FILES" ]; then
+    print_warning "Project files missing:$MISSING_FILES"
     print_warning "Copy the following files to $PROJECT_DIR:"
-    echo "  • app.py"
-    echo "  • firebase_backup.py"
-    echo "  • model_integration.py"
+    echo "  • all .py files from the dashboard directory:"
+    for file in $REQUIRED_FILES; do
+        echo "      $file"
+    done
     echo "  • templates/*.html"
     echo "  • edge-deployment/model.tflite → models/"
     echo "  • edge-deployment/config.json → models/"
@@ -240,9 +253,9 @@ echo "━━━━━━━━━━━━━━━━━━━━━━━━
 echo ""
 echo "1. 📁 Copy your project files to: $PROJECT_DIR"
 echo "   Required files:"
-echo "   • app.py"
-echo "   • firebase_backup.py"
-echo "   • model_integration.py"
+for file in $REQUIRED_FILES; do
+    echo "   • $file"
+done
 echo "   • templates/*.html"
 echo "   • models/weather_prediction_model.tflite"
 echo "   • models/model_config.json"
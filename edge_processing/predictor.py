@@ -1,9 +1,18 @@
 
 # Edge Device Prediction Function
+import os
+import sys
 import numpy as np
 import tensorflow as tf
 import json
 
+# Shared scaler (dashboard/preprocessing.py; deployed next to this file on the Pi)
+try:
+    from preprocessing import Preprocessor
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dashboard'))
+    from preprocessing import Preprocessor
+
 class WeatherPredictor:
     def __init__(self, model_path, config_path):
         # Load TFLite model
@@ -13,23 +22,59 @@ class WeatherPredictor:
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
         
+        # Tensor indices and buffer accessors are fixed once tensors are allocated
+        self.input_index = self.input_details[0]['index']
+        self.output_index = self.output_details[0]['index']
+        self._input_tensor = self.interpreter.tensor(self.input_index)
+        self._output_tensor = self.interpreter.tensor(self.output_index)
+        self.input_shape = tuple(self.input_details[0]['shape'])
+        self.batch_size = self.input_shape[0]
+        
         # Load configuration
         with open(config_path, 'r') as f:
             self.config = json.load(f)
         
-        self.scale_values = np.array(self.config['preprocessing']['scale_values'])
-        self.min_values = np.array(self.config['preprocessing']['min_values'])
+        self.preprocessor = Preprocessor.from_config(self.config)
     
     def normalize_input(self, data):
         """Normalize input data using saved scaler parameters"""
-        return (data - self.min_values) / self.scale_values
+        return self.preprocessor.transform(data)
     
     def denormalize_output(self, data):
         """Denormalize output predictions"""
         # Only denormalize the first 4 features (weather targets)
-        scale_subset = self.scale_values[:4]
-        min_subset = self.min_values[:4]
-        return (data * scale_subset) + min_subset
+        return self.preprocessor.inverse_transform(data)
+    
+    def _resize(self, batch_size):
+        """Resize the input tensor to `batch_size` windows (no-op if already that size)"""
+        if batch_size != self.batch_size:
+            self.interpreter.resize_tensor_input(self.input_index, [batch_size, *self.input_shape[1:]])
+            self.interpreter.allocate_tensors()
+            self.batch_size = batch_size
+    
+    def _invoke(self, weather_sequences):
+        """Normalize straight into the input tensor, run the model and return the raw output rows"""
+        self._resize(len(weather_sequences))
+        
+        # The view must be released before invoke(), so it is never kept on self
+        input_view = self._input_tensor()
+        self.preprocessor.transform(weather_sequences, out=input_view)
+        del input_view
+        
+        self.interpreter.invoke()
+        return self._output_tensor().copy()
+    
+    def predict_batch(self, weather_sequences):
+        """
+        Predict next day weather for many windows with one interpreter call
+        weather_sequences: array of shape (N, 30, 6)
+        Returns: array of shape (N, 4) with [precipitation, avg_temp, max_temp, min_temp] per window
+        """
+        weather_sequences = np.asarray(weather_sequences, dtype=np.float32)
+        if weather_sequences.ndim != 3 or weather_sequences.shape[1:] != tuple(self.input_shape[1:]):
+            raise ValueError(f"Expected windows of shape (N, 30, 6), got {weather_sequences.shape}")
+        
+        return self.denormalize_output(self._invoke(weather_sequences))
     
     def predict(self, weather_sequence):
         """
@@ -37,16 +82,8 @@ class WeatherPredictor:
         weather_sequence: array of shape (30, 6) with last 30 days of weather data
         Returns: [precipitation, avg_temp, max_temp, min_temp] for next day
         """
-        # Normalize input
-        normalized_input = self.normalize_input(weather_sequence)
-        
-        # Reshape for model input
-        input_data = normalized_input.reshape(1, 30, 6).astype(np.float32)
-        
         # Run prediction
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-        self.interpreter.invoke()
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
+        output_data = self._invoke(np.asarray(weather_sequence, dtype=np.float32)[np.newaxis])
         
         # Denormalize output
         prediction = self.denormalize_output(output_data[0])
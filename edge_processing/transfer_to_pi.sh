@@ -54,9 +54,7 @@ print_step "Creating project directory on Pi..."
 ssh pi@$PI_IP "mkdir -p ~/weather-dashboard-deploy"
 
 print_step "Transferring main application files..."
-scp "$PROJECT_DIR/weather-dashboard/app.py" pi@$PI_IP:~/weather-dashboard-deploy/
-scp "$PROJECT_DIR/weather-dashboard/firebase_backup.py" pi@$PI_IP:~/weather-dashboard-deploy/
-scp "$PROJECT_DIR/weather-dashboard/model_integration.py" pi@$PI_IP:~/weather-dashboard-deploy/
+scp "$PROJECT_DIR/weather-dashboard/"*.py pi@$PI_IP:~/weather-dashboard-deploy/
 
 print_step "Transferring templates..."
 scp -r "$PROJECT_DIR/weather-dashboard/templates" pi@$PI_IP:~/weather-dashboard-deploy/
@@ -69,6 +67,8 @@ ssh pi@$PI_IP "mkdir -p ~/weather-dashboard-deploy/models"
 scp "$PROJECT_DIR/edge-deployment/model.tflite" pi@$PI_IP:~/weather-dashboard-deploy/models/weather_prediction_model.tflite
 scp "$PROJECT_DIR/edge-deployment/config.json" pi@$PI_IP:~/weather-dashboard-deploy/models/model_config.json
 scp "$PROJECT_DIR/edge-deployment/predictor.py" pi@$PI_IP:~/weather-dashboard-deploy/edge_predictor.py
+# The predictor imports the scaler shared with the dashboard from its own directory
+scp "$PROJECT_DIR/edge-deployment/preprocessing.py" pi@$PI_IP:~/weather-dashboard-deploy/preprocessing.py
 
 print_step "Transferring deployment script..."
 scp "$PROJECT_DIR/deploy_to_pi.sh" pi@$PI_IP:~/weather-dashboard-deploy/
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Quantized model variants with a latency/accuracy benchmark
+Converts the trained Keras model (best_weather_model.h5) into fp32, fp16 and
+full-int8 TensorFlow Lite variants, using training windows as the
+representative dataset for int8 calibration. Each variant (and the currently
+deployed model) is then benchmarked on the held-out split: single-window
+invoke latency, interpreter memory and MAE per target in real units. The
+results are written next to each artifact as <name>.metrics.json, and the
+variants can be registered in registry.json so the dashboard can pick the
+fastest variant within its accuracy budget (MODEL_MAE_BUDGET).
+
+Usage: python3 export_variants.py [--dataset ../datasets/weather.csv] [--register]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Shared scaler (dashboard/preprocessing.py)
+try:
+    from preprocessing import Preprocessor
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dashboard'))
+    from preprocessing import Preprocessor
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOOKBACK_DAYS = 30
+TEST_FRACTION = 0.2         # Same held-out split as the training notebook
+REPRESENTATIVE_SAMPLES = 200
+TARGETS = ['precipitation', 'avg_temperature', 'max_temperature', 'min_temperature']
+VARIANTS = ['fp32', 'fp16', 'int8']
+
+
+def metrics_path(model_path):
+    """Metrics file written next to a model artifact"""
+    return os.path.splitext(model_path)[0] + '.metrics.json'
+
+
+def load_windows(dataset_path):
+    """All 30-day windows of the dataset and the next day's targets, prepared as in the notebook.
+
+    Returns (windows, targets): (N, 30, 6) feature windows in real units and
+    the (N, 4) actual [prcp, tavg, tmax, tmin] of the following day.
+    """
+    weather = pd.read_csv(dataset_path, index_col='DATE')
+    weather.columns = weather.columns.str.lower()
+    weather = weather.ffill()
+    weather['tavg'] = weather['tavg'].fillna(weather['tavg'].mean())
+    weather.index = pd.to_datetime(weather.index)
+
+    day_of_year = weather.index.dayofyear.to_numpy()
+    features = np.column_stack([
+        weather[['prcp', 'tavg', 'tmax', 'tmin']].to_numpy(dtype=np.float64),
+        np.sin(2 * np.pi * day_of_year / 365),
+        np.cos(2 * np.pi * day_of_year / 365)
+    ])
+
+    windows = sliding_window_view(features, (LOOKBACK_DAYS, features.shape[1]))[:-1, 0]
+    targets = features[LOOKBACK_DAYS:, :4]
+    return np.ascontiguousarray(windows), targets
+
+
+def split(windows, targets):
+    test_size = int(TEST_FRACTION * len(windows))
+    return (windows[:-test_size], targets[:-test_size]), (windows[-test_size:], targets[-test_size:])
+
+
+def convert(model, variant, representative_windows=None):
+    """TFLite flatbuffer of `model` for one variant"""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if variant == 'int8':
+        # Integer-only kernels (fused LSTM); float input/output so the
+        # predictors can feed scaled windows unchanged
+        def representative_dataset():
+            for window in representative_windows:
+                yield [window[np.newaxis].astype(np.float32)]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        return converter.convert()
+
+    # Same converter setup as the training notebook
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS
+    ]
+    converter._experimental_lower_tensor_list_ops = False
+    converter.experimental_enable_resource_variables = True
+    if variant == 'fp16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+def _rss_bytes():
+    """Resident set size of this process"""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def benchmark(model_path, preprocessor, windows, targets, num_threads=1):
+    """Invoke latency, memory and MAE of a TFLite model on the held-out windows"""
+    rss_before = _rss_bytes()
+    interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+
+    scaled = preprocessor.transform(windows, out=np.empty(windows.shape, dtype=np.float32))
+
+    # Warm up, then time single-window invokes as the dashboard runs them
+    for window in scaled[:10]:
+        interpreter.set_tensor(input_index, window[np.newaxis])
+        interpreter.invoke()
+
+    outputs = np.empty((len(scaled), 4), dtype=np.float32)
+    latencies = np.empty(len(scaled))
+    for i, window in enumerate(scaled):
+        interpreter.set_tensor(input_index, window[np.newaxis])
+        started = time.perf_counter()
+        interpreter.invoke()
+        latencies[i] = (time.perf_counter() - started) * 1000
+        outputs[i] = interpreter.get_tensor(output_index)[0]
+    memory_bytes = _rss_bytes() - rss_before
+
+    mae = np.abs(preprocessor.inverse_transform(outputs) - targets).mean(axis=0)
+    return {
+        'size_bytes': os.path.getsize(model_path),
+        'memory_bytes': int(memory_bytes),
+        'num_threads': num_threads,
+        'latency_ms': {
+            'mean': round(float(latencies.mean()), 4),
+            'p50': round(float(np.percentile(latencies, 50)), 4),
+            'p95': round(float(np.percentile(latencies, 95)), 4)
+        },
+        'mae': {target: round(float(mae[i]), 4) for i, target in enumerate(TARGETS)},
+        'temperature_mae': round(float(mae[1:].mean()), 4),
+        'held_out_windows': len(windows),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def write_metrics(model_path, metrics):
+    with open(metrics_path(model_path), 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+
+def register_variants(registry_path, artifacts, config_name):
+    """Add the variants to the registry as alternative builds of the active version"""
+    with open(registry_path, 'r') as f:
+        registry = json.load(f)
+
+    base_id = registry['active']
+    base = registry['models'][base_id]
+    base.setdefault('metrics', os.path.basename(metrics_path(base['model'])))
+    variant_ids = []
+    for variant, model_path in artifacts.items():
+        version_id = f"{base_id}-{variant}"
+        registry['models'][version_id] = {
+            'model': os.path.basename(model_path),
+            'config': config_name,
+            'metrics': os.path.basename(metrics_path(model_path)),
+            'description': f"{variant} export of {base_id}"
+        }
+        variant_ids.append(version_id)
+    base['variants'] = variant_ids
+
+    with open(registry_path, 'w') as f:
+        json.dump(registry, f, indent=2)
+    print(f"📒 Registered {', '.join(variant_ids)} as variants of {base_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--keras-model', default=os.path.join(MODELS_DIR, 'best_weather_model.h5'))
+    parser.add_argument('--config', default=os.path.join(MODELS_DIR, 'model_config.json'))
+    parser.add_argument('--dataset', default=os.path.join(MODELS_DIR, '..', 'datasets', 'weather.csv'))
+    parser.add_argument('--current', default=os.path.join(MODELS_DIR, 'weather_prediction_model.tflite'),
+                        help='deployed model to benchmark as the baseline')
+    parser.add_argument('--output-dir', default=MODELS_DIR)
+    parser.add_argument('--num-threads', type=int, default=1)
+    parser.add_argument('--register', action='store_true', help='add the variants to registry.json')
+    args = parser.parse_args()
+
+    preprocessor = Preprocessor.load(args.config)
+    windows, targets = load_windows(args.dataset)
+    (train_windows, _), (test_windows, test_targets) = split(windows, targets)
+    print(f"📅 {len(train_windows)} training and {len(test_windows)} held-out windows")
+
+    # Calibration windows spread over the whole training period
+    sample = np.linspace(0, len(train_windows) - 1, min(REPRESENTATIVE_SAMPLES, len(train_windows))).astype(int)
+    representative = preprocessor.transform(train_windows[sample],
+                                            out=np.empty((len(sample), LOOKBACK_DAYS, 6), dtype=np.float32))
+
+    model = tf.keras.models.load_model(args.keras_model, compile=False)
+    base_name = os.path.splitext(os.path.basename(args.current))[0]
+
+    artifacts = {}
+    for variant in VARIANTS:
+        model_path = os.path.join(args.output_dir, f"{base_name}_{variant}.tflite")
+        try:
+            flatbuffer = convert(model, variant, representative)
+        except Exception as e:
+            print(f"⚠️ {variant} conversion failed: {e}")
+            continue
+        with open(model_path, 'wb') as f:
+            f.write(flatbuffer)
+        artifacts[variant] = model_path
+        print(f"📦 {variant}: {os.path.basename(model_path)} ({len(flatbuffer) / 1024:.1f} KB)")
+
+    results = {}
+    for variant, model_path in [('current', args.current), *artifacts.items()]:
+        if not os.path.exists(model_path):
+            continue
+        metrics = benchmark(model_path, preprocessor, test_windows, test_targets, args.num_threads)
+        metrics['variant'] = variant
+        write_metrics(model_path, metrics)
+        results[variant] = metrics
+
+    print(f"\n{'variant':<8} {'size KB':>8} {'memory KB':>10} {'p50 ms':>8} {'p95 ms':>8} {'temp MAE':>9} {'prcp MAE':>9}")
+    for variant, metrics in results.items():
+        print(f"{variant:<8} {metrics['size_bytes'] / 1024:>8.1f} {metrics['memory_bytes'] / 1024:>10.0f} "
+              f"{metrics['latency_ms']['p50']:>8.3f} {metrics['latency_ms']['p95']:>8.3f} "
+              f"{metrics['temperature_mae']:>9.3f} {metrics['mae']['precipitation']:>9.3f}")
+
+    registry_path = os.path.join(args.output_dir, 'registry.json')
+    if args.register and artifacts:
+        if os.path.exists(registry_path):
+            register_variants(registry_path, artifacts, os.path.relpath(args.config, args.output_dir))
+        else:
+            print(f"⚠️ No registry at {registry_path}, variants not registered")
+
+
+if __name__ == '__main__':
+    main()